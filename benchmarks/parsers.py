@@ -0,0 +1,80 @@
+# benchmarks/parsers.py
+#
+# Compares the lxml/regex extractors in core.parsers against the previous
+# BeautifulSoup code path on the saved fixture pages.
+#
+#   python benchmarks/parsers.py [--iterations 200]
+
+import os
+import re
+import sys
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parsers import parse_sales, parse_search_asin
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def bs4_search_asin(content: bytes):
+    html = content.decode("utf-8", errors="ignore")
+    soup = BeautifulSoup(html, "lxml")
+
+    for product in soup.find_all("div", attrs={"data-component-type": "s-search-result"}):
+        if product.find(name="span", string="Sponsored"):
+            continue
+
+        asin = product.get("data-asin")
+        if asin and len(asin) == 10:
+            return asin
+    return None
+
+
+def bs4_sales(content: bytes):
+    soup = BeautifulSoup(content.decode("utf-8", errors="ignore"), "lxml")
+
+    sales_tag = soup.find("span", class_="estimated_sales_per_mo")
+    if not sales_tag:
+        return None
+
+    match = re.search(r"\d+", sales_tag.get_text(strip=True).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def load(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def bench(func, content: bytes, iterations: int) -> tuple:
+    result = func(content)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(content)
+    elapsed = time.perf_counter() - start
+    return result, elapsed / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("amazon_search.html", "BeautifulSoup", bs4_search_asin),
+        ("amazon_search.html", "lxml XPath", parse_search_asin),
+        ("sas_lookup.html", "BeautifulSoup", bs4_sales),
+        ("sas_lookup.html", "regex", lambda content: parse_sales(content)[1]),
+    ]
+
+    print(f"{'fixture':<22}{'parser':<16}{'ms/page':>10}  result")
+    for fixture, name, func in cases:
+        result, ms = bench(func, load(fixture), args.iterations)
+        print(f"{fixture:<22}{name:<16}{ms:>10.3f}  {result}")
+
+
+if __name__ == "__main__":
+    main()
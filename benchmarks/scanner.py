@@ -0,0 +1,176 @@
+# benchmarks/scanner.py
+#
+# End-to-end throughput of scanner.py (and optionally poster.py) against the
+# local stand-ins in benchmarks/standins.py, in a scratch data directory.
+#
+#   python benchmarks/scanner.py [--products 10000] [--latency-ms 50] \
+#       [--error-rate 0.01] [--throttle-rate 0.01] [--runs 2] [--poster]
+#
+# Reports products/sec, peak RSS of the process tree and per-stage/per-host
+# latencies from each run's data/reports/*.json. Repeated runs reuse the
+# data directory, so the second one measures a warm-cache incremental scan.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standins import add_arguments, from_args
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def tree_rss(pid: int) -> int:
+    """
+    Resident set size in bytes of `pid` and its direct children (the parser
+    pool workers), read from /proc.
+    """
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+
+    total = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/statm") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            pass
+    return total
+
+
+def report_path(workdir: str, name: str) -> str:
+    return os.path.join(workdir, "data", "reports", f"{name}.json")
+
+
+async def run(script: str, args: list, env: dict, workdir: str, log_name: str) -> tuple:
+    """
+    Runs one of the repo scripts in `workdir`, sampling its memory until it
+    exits. Returns its wall time, peak RSS and exit code, and the report it
+    wrote.
+    """
+    name = os.path.splitext(script)[0]
+    if os.path.exists(report_path(workdir, name)):
+        os.remove(report_path(workdir, name))
+
+    with open(os.path.join(workdir, log_name), "w") as log:
+        start = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(ROOT, script), *args,
+            cwd=workdir, env=env, stdout=log, stderr=asyncio.subprocess.STDOUT,
+        )
+
+        peak = 0
+        while process.returncode is None:
+            peak = max(peak, tree_rss(process.pid))
+            try:
+                await asyncio.wait_for(process.wait(), 0.2)
+            except asyncio.TimeoutError:
+                pass
+
+    result = {
+        "wall_s": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(peak / 2 ** 20, 1),
+        "returncode": process.returncode,
+    }
+
+    try:
+        with open(report_path(workdir, name)) as f:
+            return result, json.load(f)
+    except (OSError, ValueError):
+        return result, {}
+
+
+def print_timers(report: dict):
+    timers = report.get("timers", {})
+    print(f"  {'timer':<38}{'calls':>8}{'total s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'peak':>6}")
+
+    for prefix in ("stage.", "http.", ""):
+        for name, timer in timers.items():
+            if not name.startswith(prefix) or (not prefix and name.startswith(("stage.", "http."))):
+                continue
+            total = timer["mean_ms"] * timer["count"] / 1000
+            print(
+                f"  {name:<38}{timer['count']:>8}{total:>10.1f}{timer['p50_ms']:>9.1f}"
+                f"{timer['p95_ms']:>9.1f}{timer['p99_ms']:>9.1f}{timer['peak_inflight']:>6}"
+            )
+
+
+def summarise(label: str, result: dict, report: dict, items: int, unit: str = "products"):
+    duration = report.get("duration_s") or result["wall_s"]
+    result[f"{unit}_per_s"] = round(items / duration, 1) if duration else 0.0
+
+    print(
+        f"\n{label}: {items} {unit} in {duration:.1f}s ({result['wall_s']:.1f}s wall), "
+        f"{result[f'{unit}_per_s']:.1f} {unit}/s, peak RSS {result['peak_rss_mb']:.0f} MB"
+        + (f", exit code {result['returncode']}" if result["returncode"] else "")
+    )
+    if report.get("pipeline"):
+        print("  rejected by stage: " + ", ".join(f"{name} {stage['rejected']}" for name, stage in report["pipeline"].items()))
+    print_timers(report)
+
+
+async def benchmark(args):
+    standins = from_args(args)
+    await standins.start()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="qogita-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    env = {key: value for key, value in os.environ.items() if key != "PROXY"}
+    env.update(standins.env(args.unlimited))
+    env.update({"POST_MIN_DELAY": "0", "POST_MAX_DELAY": "0"})
+
+    print(f"Stand-ins: {standins.urls}")
+    print(f"Working directory: {workdir}")
+
+    results = []
+    try:
+        for i in range(args.runs):
+            scan_args = ["--marketplaces", args.marketplaces] + (["--full"] if args.full else [])
+            result, report = await run("scanner.py", scan_args, env, workdir, f"scanner.{i + 1}.log")
+            summarise(f"Scanner run {i + 1}", result, report, args.products)
+            results.append({"run": "scanner", **result, "report": report})
+
+            if args.poster:
+                result, report = await run("poster.py", [], env, workdir, f"poster.{i + 1}.log")
+                messages = report.get("timers", {}).get("discord.post", {}).get("count", 0)
+                summarise(f"Poster run {i + 1}", result, report, messages, "messages")
+                results.append({"run": "poster", **result, "report": report})
+    finally:
+        await standins.stop()
+
+    print("\nStand-in requests:")
+    for key, count in sorted(standins.requests.items()):
+        print(f"  {key:<44}{count:>8}")
+
+    path = os.path.join(workdir, "benchmark.json")
+    with open(path, "w") as f:
+        json.dump({"args": vars(args), "requests": standins.requests, "results": results}, f, indent=2)
+    print(f"\nFull results written to {path}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scanner/poster benchmark")
+    add_arguments(parser)
+    parser.add_argument("--runs", type=int, default=1, help="Scanner runs over the same data directory.")
+    parser.add_argument("--full", action="store_true", help="Pass --full to every scanner run.")
+    parser.add_argument("--marketplaces", default="FR", help="Marketplaces passed to every scanner run.")
+    parser.add_argument("--poster", action="store_true", help="Run poster.py after each scan.")
+    parser.add_argument("--workdir", help="Data directory to run in (default: a new temporary one).")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# benchmarks/standins.py
+#
+# Local stand-ins for every upstream the scanner and poster talk to: the
+# products feed and cookies, the amazon.fr search page, the Seller Central
+# revenue calculator (productmatch, getadditionalpronductinfo, getfees), the
+# SAS lookup page and a Discord webhook. Responses are built from the saved
+# fixtures with values derived from the EAN/ASIN, so runs are reproducible.
+#
+#   python benchmarks/standins.py [--products 1000] [--latency-ms 50] ...
+#
+# prints the environment to point scanner.py/poster.py at them and serves
+# until interrupted.
+
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import random
+import asyncio
+import argparse
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.fees import DIGITAL_SERVICES_RATES, FeeModel
+from core.ratelimit import HOST_LIMITS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Organic ASIN and sales figure baked into the fixtures, swapped per request.
+FIXTURE_ASIN = b"B091633537"
+FIXTURE_SALES = b">1,234<"
+
+GLS = ("gl_beauty", "gl_drugstore", "gl_health_personal_care", "gl_toy", "gl_kitchen", "gl_book", "gl_pc")
+
+# Which production host each stand-in replaces, for its rate limits.
+UPSTREAMS = {
+    "amazon": "www.amazon.fr",
+    "seller_central": "sellercentral-europe.amazon.com",
+    "sas": "sas.selleramp.com",
+    "discord": None,
+    "feed": None,
+}
+
+# Discord allows about 5 posts per 2 seconds per webhook.
+WEBHOOK_BUCKET = (5, 2.0)
+
+
+def unit(key: str, salt: str) -> float:
+    """
+    Deterministic value in [0, 1) for `key`.
+    """
+    digest = hashlib.blake2b(f"{salt}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def asin_for(ean: str) -> str:
+    return f"B0{zlib.crc32(ean.encode()) % 10 ** 8:08d}"
+
+
+def load(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class StandIns:
+    """
+    One aiohttp application listening on a separate port per upstream, so
+    each gets its own host key in the rate limiter.
+
+    Upstream routes (not the feed or cookies) sleep `latency` seconds +-50%,
+    then fail with a 500 at `error_rate` or a 429 at `throttle_rate`.
+    """
+
+    def __init__(
+        self,
+        products: int = 1000,
+        latency: float = 0.05,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        miss_rate: float = 0.1,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+    ):
+        self.products = products
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.miss_rate = miss_rate
+        self.seed = seed
+        self.host = host
+
+        self.search_page = load("amazon_search.html")
+        self.sas_page = load("sas_lookup.html")
+        self.random = random.Random(seed)
+
+        self.requests = {}
+        self.webhook_window = (0.0, 0)
+        self.runner = None
+        self.urls = {}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_get("/products.json", self.feed)
+        app.router.add_get("/cookies.json", self.cookies)
+        app.router.add_get("/s", self.search)
+        app.router.add_get("/rcpublic/productmatch", self.productmatch)
+        app.router.add_get("/rcpublic/getadditionalpronductinfo", self.price)
+        app.router.add_post("/rcpublic/getfees", self.fees)
+        app.router.add_get("/sas/lookup", self.sas)
+        app.router.add_post("/webhook", self.webhook)
+        return app
+
+    async def start(self) -> dict:
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+
+        for name in UPSTREAMS:
+            site = web.TCPSite(self.runner, self.host, 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.urls[name] = f"http://{self.host}:{port}"
+
+        return self.urls
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def env(self, unlimited: bool = False) -> dict:
+        """
+        Environment pointing scanner.py and poster.py at the stand-ins, with
+        each stand-in host limited like the production host it replaces.
+        """
+        limits = []
+        for name, upstream in UPSTREAMS.items():
+            if upstream:
+                rate, concurrency = (1e6, 1000) if unlimited else HOST_LIMITS[upstream]
+                limits.append(f"{self.urls[name].split('//')[1]}={rate}:{concurrency}")
+
+        return {
+            "PRODUCTS_URL": f"{self.urls['feed']}/products.json",
+            "COOKIE_URL": f"{self.urls['feed']}/cookies.json",
+            "AMAZON_URL": self.urls["amazon"],
+            "SELLER_CENTRAL_URL": self.urls["seller_central"],
+            "SAS_URL": self.urls["sas"],
+            "DISCORD_WEBHOOK": f"{self.urls['discord']}/webhook",
+            "RATE_LIMITS": ",".join(limits),
+        }
+
+    @web.middleware
+    async def faults(self, request, handler):
+        route = request.path
+        if route not in ("/products.json", "/cookies.json"):
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+
+            roll = self.random.random()
+            if roll < self.error_rate:
+                return self.count(route, web.Response(status=500, text="Internal error"))
+            if roll < self.error_rate + self.throttle_rate:
+                if route == "/webhook":
+                    return self.count(route, web.json_response({"retry_after": 0.5}, status=429))
+                return self.count(route, web.Response(status=429, text="Too many requests"))
+
+        return self.count(route, await handler(request))
+
+    def count(self, route: str, response):
+        key = f"{route} {response.status}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+        return response
+
+    def not_modified(self, request, etag: str) -> bool:
+        return request.headers.get("If-None-Match") == etag
+
+    async def feed(self, request):
+        etag = f'"feed-{self.products}-{self.seed}"'
+        if self.not_modified(request, etag):
+            return web.Response(status=304, headers={"ETag": etag})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json", "ETag": etag})
+        await response.prepare(request)
+
+        rng = random.Random(self.seed)
+        parts = []
+        first = True
+        for i in range(self.products):
+            gtin = str(3000000000000 + i)
+            product = {
+                "product_gtin": gtin,
+                "product_name": f"Benchmark product {i}",
+                "supplier_price": round(rng.uniform(2.0, 40.0), 2),
+                "product_link": f"https://www.qogita.com/products/{gtin}/",
+            }
+            parts.append(json.dumps(product))
+
+            if len(parts) == 500 or i == self.products - 1:
+                await response.write((("[" if first else ",") + ",".join(parts)).encode())
+                parts, first = [], False
+
+        await response.write(b"[]" if first else b"]")
+        await response.write_eof()
+        return response
+
+    async def cookies(self, request):
+        etag = '"cookies"'
+        if self.not_modified(request, etag):
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.json_response({
+            "set1": {"amazon": "session-id=benchmark", "seller": "session-id=benchmark"},
+            "sas": [{"name": "sas_session", "value": "benchmark", "domain": ".selleramp.com", "path": "/"}],
+        }, headers={"ETag": etag})
+
+    async def search(self, request):
+        ean = request.query.get("k", "")
+        if unit(ean, "miss") < self.miss_rate:
+            return web.Response(body=b"<html><body></body></html>", content_type="text/html")
+
+        body = self.search_page.replace(FIXTURE_ASIN, asin_for(ean).encode())
+        return web.Response(body=body, content_type="text/html")
+
+    @staticmethod
+    def listing(asin: str, country: str = "FR") -> tuple:
+        gl = GLS[int(unit(asin, "gl") * len(GLS))]
+        price = round(5.0 + 75.0 * unit(f"{country}:{asin}", "price"), 2)
+        return gl, price
+
+    async def productmatch(self, request):
+        asin = request.query.get("searchKey", "")
+        gl, _ = self.listing(asin)
+        return web.json_response({"data": {"otherProducts": {"products": [{
+            "asin": asin,
+            "title": f"Benchmark listing {asin}",
+            "link": f"https://www.amazon.fr/dp/{asin}",
+            "gl": gl,
+            "imageUrl": f"https://m.media-amazon.com/images/I/{asin}.jpg",
+        }]}}})
+
+    async def price(self, request):
+        _, price = self.listing(request.query.get("asin", ""), request.query.get("countryCode", "FR"))
+        return web.json_response({"data": {"price": {"amount": price, "currency": "EUR"}}})
+
+    async def fees(self, request):
+        payload = await request.json()
+        item, country = payload["itemInfo"], payload.get("countryCode", "FR")
+        asin, gl, price = item["asin"], item["glProductGroupName"], float(item["afnPriceStr"])
+
+        referral = FeeModel.referral_fee(gl, price)
+        closing = FeeModel.closing_fee(gl)
+        fulfillment = round(2.5 + 3.5 * unit(f"{country}:{asin}", "fulfillment"), 2)
+        storage = round(0.1 + 0.4 * unit(f"{country}:{asin}", "storage"), 2)
+        digital = (referral + closing + fulfillment) * DIGITAL_SERVICES_RATES.get(country, 0.0)
+
+        def amount(value):
+            return {"total": {"amount": round(value, 2), "currency": "EUR"}}
+
+        return web.json_response({"data": {"programFeeResultMap": {"Core#0": {
+            "perUnitPeakStorageFee": amount(storage),
+            "otherFeeInfoMap": {
+                "FulfillmentFee": amount(fulfillment),
+                "FixedClosingFee": amount(0.0),
+                "ReferralFee": amount(referral),
+                "VariableClosingFee": amount(closing),
+                "DigitalServicesFee": amount(digital),
+            },
+        }}}})
+
+    async def sas(self, request):
+        asin = request.query.get("SasLookup[search_term]", "")
+        sales = int(200 * unit(asin, "sales") ** 2)
+        body = self.sas_page.replace(FIXTURE_SALES, f">{sales:,}<".encode())
+        return web.Response(body=body, content_type="text/html")
+
+    async def webhook(self, request):
+        await request.read()
+
+        limit, period = WEBHOOK_BUCKET
+        now = time.monotonic()
+        started, used = self.webhook_window
+        if now - started >= period:
+            started, used = now, 0
+
+        headers = {"X-RateLimit-Bucket": "benchmark", "X-RateLimit-Limit": str(limit)}
+        reset_after = f"{period - (now - started):.3f}"
+
+        if used >= limit:
+            headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": reset_after})
+            return web.json_response({"retry_after": float(reset_after)}, status=429, headers=headers)
+
+        self.webhook_window = (started, used + 1)
+        headers.update({"X-RateLimit-Remaining": str(limit - used - 1), "X-RateLimit-Reset-After": reset_after})
+        return web.Response(status=204, headers=headers)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--products", type=int, default=1000, help="Synthetic feed size.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean upstream latency (+-50%%).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream requests failing with 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of upstream requests answered with 429.")
+    parser.add_argument("--miss-rate", type=float, default=0.1, help="Share of EANs without an Amazon match.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unlimited", action="store_true", help="Lift the per-host rate limits.")
+
+
+def from_args(args) -> StandIns:
+    return StandIns(
+        products=args.products,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        miss_rate=args.miss_rate,
+        seed=args.seed,
+    )
+
+
+async def serve(args):
+    standins = from_args(args)
+    await standins.start()
+
+    for key, value in standins.env(args.unlimited).items():
+        print(f"export {key}={value}")
+    sys.stdout.flush()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standins.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in upstream servers")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
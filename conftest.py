@@ -0,0 +1,4 @@
+# conftest.py
+#
+# Lets pytest put the repository root on sys.path, so tests can import
+# `core` and the top-level scripts without installing anything.
@@ -0,0 +1,122 @@
+# core/cache.py
+
+import os
+import json
+import time
+import sqlite3
+from typing import Any
+from .logger import get_logger
+
+logger = get_logger("Cache")
+
+CACHE_DIR = "data/cache"
+
+
+class DiskCache:
+    """
+    Small persistent key/value cache on SQLite with per-entry TTL and
+    LRU eviction once `max_entries` is exceeded.
+
+    `get` returns a `(found, value)` tuple so a cached `None` (a negative
+    result) can be told apart from a miss.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used);
+    """
+
+    def __init__(self, name: str, max_entries: int = 100_000, directory: str = CACHE_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+        self.name = name
+        self.max_entries = max_entries
+        self.path = os.path.join(directory, f"{name}.db")
+
+        self.conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._sets = 0
+
+    def get(self, key: str) -> tuple:
+        found, value, _ = self.get_with_age(key)
+        return found, value
+
+    def get_with_age(self, key: str) -> tuple:
+        """
+        Like `get`, plus the entry's age in seconds, for callers that apply
+        their own staleness policy on top of the hard TTL.
+        """
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return False, None, None
+
+        if row[2] < now:
+            self.expired += 1
+            self.misses += 1
+            return False, None, None
+
+        self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return True, json.loads(row[0]), now - row[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        self.conn.execute(
+            "INSERT INTO entries (key, value, stored_at, expires_at, last_used) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at, "
+            "expires_at = excluded.expires_at, last_used = excluded.last_used",
+            (key, json.dumps(value), now, now + ttl, now),
+        )
+
+        self._sets += 1
+        if self._sets % 500 == 0:
+            self.evict()
+
+    def evict(self):
+        now = time.time()
+        self.conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        if not self.conn:
+            return
+        self.evict()
+        self.conn.close()
+        self.conn = None
+        logger.info(f"Cache {self.name}: {self.stats()}")
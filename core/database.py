@@ -1,81 +1,89 @@
 # core/database.py
 
 import os
-import json
 import asyncio
 from datetime import datetime, timezone
+from typing import Optional
 from .logger import get_logger
+from .metrics import metrics
+from .deal import Deal
+from .storage import JsonStorage, SQLiteStorage
 
 logger = get_logger("Database")
 
-DB_PATH = "data/deals.json"
+BACKENDS = {
+    "json": JsonStorage,
+    "sqlite": SQLiteStorage,
+}
 
 
 class Database:
-    def __init__(self):
-        os.makedirs("data", exist_ok=True)
+    def __init__(self, backend: Optional[str] = None, path: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) if path else "data", exist_ok=True)
 
-        if not os.path.exists(DB_PATH):
-            with open(DB_PATH, "w", encoding="utf-8") as f:
-                json.dump([], f)
+        backend = backend or os.getenv("DB_BACKEND", "sqlite")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown database backend: {backend}")
 
-        self._lock = asyncio.Lock()
+        if path is None:
+            self.storage = BACKENDS[backend]()
+        elif backend == "sqlite":
+            self.storage = SQLiteStorage(os.path.splitext(path)[0] + ".db", path)
+        else:
+            self.storage = JsonStorage(path)
+        self.storage.open()
 
-    async def _read_all(self):
-        async with self._lock:
-            try:
-                with open(DB_PATH, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                logger.error("Database missing or corrupted. Resetting.")
-                return []
-
-    async def _write_all(self, data):
-        async with self._lock:
-            with open(DB_PATH, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+        self._lock = asyncio.Lock()
 
+    @metrics.timed("db.save_deal")
     async def save_deal(self, deal: dict):
-        deals = await self._read_all()
-
-        for existing in deals:
-            if existing["asin"] == deal["asin"] or existing["ean"] == deal["ean"]:
-                logger.info(f"Duplicate skipped: ASIN {deal['asin']}")
-                return False
-
         deal["posted"] = False
         deal["posted_at"] = None
         deal["created_at"] = datetime.now(timezone.utc).isoformat()
 
-        deals.append(deal)
-        await self._write_all(deals)
+        async with self._lock:
+            saved = self.storage.insert(Deal.from_dict(deal))
+
+        if not saved:
+            logger.info(f"Duplicate skipped: ASIN {deal['asin']}")
+            return False
 
         logger.info(f"Saved ASIN {deal['asin']} to database.")
         return True
 
+    async def count(self) -> int:
+        async with self._lock:
+            return self.storage.count()
+
+    @metrics.timed("db.get_unposted_deals")
     async def get_unposted_deals(self, limit: int):
-        deals = await self._read_all()
+        async with self._lock:
+            return [deal.to_dict() for deal in self.storage.unposted(limit)]
 
-        unposted = [d for d in deals if not d.get("posted", False)]
+    async def mark_as_posted(self, asin: str):
+        await self.mark_as_posted_many([asin])
 
-        unposted.sort(key=lambda d: d.get("created_at", ""))
+    @metrics.timed("db.mark_as_posted_many")
+    async def mark_as_posted_many(self, asins: list, posted_at: Optional[str] = None):
+        posted_at = posted_at or datetime.now(timezone.utc).isoformat()
 
-        return unposted[:limit]
+        async with self._lock:
+            marked = self.storage.mark_posted(asins, posted_at)
+        logger.info(f"Marked {marked} ASIN(s) as posted: {', '.join(asins)}.")
+        return marked
+
+    @metrics.timed("db.flush")
+    async def flush(self):
+        """
+        Persists pending changes to the deal file now.
+        """
+        async with self._lock:
+            self.storage.flush()
 
-    async def mark_as_posted(self, asin: str):
-        deals = await self._read_all()
-
-        for deal in deals:
-            if deal["asin"] == asin:
-                deal["posted"] = True
-                deal["posted_at"] = datetime.now(timezone.utc).isoformat()
-                break
-
-        await self._write_all(deals)
-        logger.info(f"Marked ASIN {asin} as posted.")
-
-    @staticmethod
-    async def reset_db():
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-                json.dump([], f)
-        
+    async def reset_db(self):
+        async with self._lock:
+            self.storage.reset()
+
+    async def close(self):
+        async with self._lock:
+            self.storage.close()
@@ -0,0 +1,93 @@
+# core/deal.py
+
+from dataclasses import dataclass
+from typing import Optional
+from .marketplaces import DEFAULT_MARKETPLACE, MARKETPLACES
+
+SCHEMA_VERSION = 2
+
+# Compact on-disk keys, in record order.
+COMPACT_KEYS = {
+    "ean": "e",
+    "asin": "a",
+    "name": "n",
+    "supplier_cost": "c",
+    "amazon_price": "p",
+    "fees": "f",
+    "profit": "pr",
+    "roi": "r",
+    "estimated_sales": "s",
+    "supplier_link": "sl",
+    "image_url": "i",
+    "marketplace": "m",
+    "posted": "po",
+    "posted_at": "pa",
+    "created_at": "ca",
+}
+
+
+@dataclass(slots=True)
+class Deal:
+    """
+    A stored deal, for the marketplace it was found best on. The Amazon and
+    SAS links are derived from the ASIN on demand instead of being stored.
+    """
+
+    ean: str
+    asin: str
+    name: str
+    supplier_cost: float
+    amazon_price: float
+    fees: float
+    profit: float
+    roi: float
+    estimated_sales: float
+    supplier_link: str
+    image_url: str
+    marketplace: str = DEFAULT_MARKETPLACE
+    posted: bool = False
+    posted_at: Optional[str] = None
+    created_at: str = ""
+
+    @property
+    def amazon_link(self) -> str:
+        return f"https://www.{MARKETPLACES[self.marketplace]}/gp/product/{self.asin}/ref=xx_dp_cont_revecalc"
+
+    @property
+    def sas_link(self) -> str:
+        return f"https://sas.selleramp.com/sas/lookup?SasLookup%5Bsearch_term%5D={self.asin}"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Deal":
+        return cls(**{key: data[key] for key in COMPACT_KEYS if key in data})
+
+    def to_dict(self) -> dict:
+        """
+        The full record, with links, in `deals.json` key order.
+        """
+        return {
+            "ean": self.ean,
+            "asin": self.asin,
+            "marketplace": self.marketplace,
+            "name": self.name,
+            "supplier_cost": self.supplier_cost,
+            "amazon_price": self.amazon_price,
+            "fees": self.fees,
+            "profit": self.profit,
+            "roi": self.roi,
+            "estimated_sales": self.estimated_sales,
+            "amazon_link": self.amazon_link,
+            "supplier_link": self.supplier_link,
+            "sas_link": self.sas_link,
+            "image_url": self.image_url,
+            "posted": self.posted,
+            "posted_at": self.posted_at,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_compact(cls, data: dict) -> "Deal":
+        return cls(**{key: data[short] for key, short in COMPACT_KEYS.items() if short in data})
+
+    def to_compact(self) -> dict:
+        return {short: getattr(self, key) for key, short in COMPACT_KEYS.items()}
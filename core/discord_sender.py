@@ -1,14 +1,57 @@
 # core/discord_sender.py
 
+import time
+import asyncio
+from typing import Optional
 import aiohttp
 from .logger import get_logger
+from .marketplaces import MARKETPLACES
+from .metrics import metrics
 
 logger = get_logger("DiscordSender")
 
+# Discord limits per webhook message.
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+# Discord limits per embed.
+MAX_TITLE_CHARS = 256
+MAX_DESCRIPTION_CHARS = 4096
+MAX_FIELD_NAME_CHARS = 256
+MAX_FIELD_VALUE_CHARS = 1024
+
+
+def clip(text: str, limit: int) -> str:
+    """
+    Shortens `text` to at most `limit` characters, marking the cut.
+    """
+    text = str(text)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
 
 class DiscordSender:
-    def __init__(self, webhook_url: str):
+    """
+    Posts deal embeds to one Discord webhook over a shared aiohttp session.
+
+    Posts to the same webhook are serialised and paced by the webhook's
+    rate-limit bucket: when `X-RateLimit-Remaining` hits zero the next post
+    waits out `X-RateLimit-Reset-After`, and a 429 is retried after its
+    `retry_after`.
+    """
+
+    def __init__(self, webhook_url: str, session: Optional[aiohttp.ClientSession] = None, max_retries: int = 3):
         self.webhook_url = webhook_url
+        self.session = session
+        self._own_session = session is None
+        self.max_retries = max_retries
+
+        self.bucket = None
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def close(self):
+        if self._own_session and self.session:
+            await self.session.close()
+            self.session = None
 
     @staticmethod
     def roi_color(roi: float) -> int:
@@ -21,16 +64,35 @@ class DiscordSender:
         else:
             return 0xE74C3C
 
-    async def send_deal(self, deal: dict):
-        embed = {
-            "title": f"**{deal['name']}**",
-            "color": self.roi_color(deal['roi']),
+    @classmethod
+    def build_embed(cls, deal: dict) -> dict:
+        """
+        One deal's embed, clipped to Discord's per-embed limits: a single
+        oversized name or link would otherwise get the whole message rejected
+        with a 400, on every run.
+        """
+        embed = cls._embed(deal)
+        embed["title"] = clip(embed["title"], MAX_TITLE_CHARS)
+        if "description" in embed:
+            embed["description"] = clip(embed["description"], MAX_DESCRIPTION_CHARS)
+        for field in embed["fields"]:
+            field["name"] = clip(field["name"], MAX_FIELD_NAME_CHARS)
+            # Discord also rejects empty field values.
+            field["value"] = clip(field["value"], MAX_FIELD_VALUE_CHARS) or "-"
+        return embed
+
+    @classmethod
+    def _embed(cls, deal: dict) -> dict:
+        return {
+            "title": f"**{clip(deal['name'], MAX_TITLE_CHARS - 4)}**",
+            "color": cls.roi_color(deal['roi']),
             "thumbnail": {
                 "url": f"{deal['image_url']}"
             },
             "fields": [
                 {"name": "EAN", "value": deal['ean'], "inline": False},
                 {"name": "ASIN", "value": deal['asin'], "inline": False},
+                {"name": "Marketplace", "value": MARKETPLACES[deal['marketplace']], "inline": False},
                 {"name": "Supplier (incl VAT)", "value": f"€{deal['supplier_cost']:.2f}", "inline": False},
                 {"name": "Amazon Price", "value": f"€{deal['amazon_price']:.2f}", "inline": False},
                 {"name": "Fees + FBA", "value": f"€{deal['fees']:.2f}", "inline": False},
@@ -45,14 +107,102 @@ class DiscordSender:
             ],
         }
 
-        payload = {"embeds": [embed]}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.webhook_url, json=payload) as response:
-                if response.status in (200, 204):
-                    logger.info(f"Posted ASIN {deal['asin']} to Discord.")
-                    return True
-                else:
-                    text = await response.text()
-                    logger.error(f"Discord error: {response.status} - {text}")
-                    return False
+    @staticmethod
+    def embed_chars(embed: dict) -> int:
+        """
+        Characters counted towards Discord's per-message embed total.
+        """
+        count = len(embed.get("title", "")) + len(embed.get("description", ""))
+        count += len(embed.get("footer", {}).get("text", "")) + len(embed.get("author", {}).get("name", ""))
+        for field in embed.get("fields", []):
+            count += len(field["name"]) + len(field["value"])
+        return count
+
+    @classmethod
+    def pack(cls, deals: list) -> list:
+        """
+        Splits deals into batches that each fit in one webhook message.
+        """
+        batches = []
+        batch, chars = [], 0
+
+        for deal in deals:
+            size = cls.embed_chars(cls.build_embed(deal))
+            if batch and (len(batch) >= MAX_EMBEDS or chars + size > MAX_EMBED_CHARS):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(deal)
+            chars += size
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def send_deals(self, deals: list) -> list:
+        """
+        Posts deals as multi-embed messages. Returns one success flag per deal,
+        in order.
+        """
+        results = []
+
+        for batch in self.pack(deals):
+            payload = {"embeds": [self.build_embed(deal) for deal in batch]}
+            success = await self._post(payload)
+
+            if success:
+                logger.info(f"Posted ASINs {', '.join(d['asin'] for d in batch)} to Discord.")
+            results.extend([success] * len(batch))
+
+        return results
+
+    async def send_deal(self, deal: dict):
+        payload = {"embeds": [self.build_embed(deal)]}
+
+        if await self._post(payload):
+            logger.info(f"Posted ASIN {deal['asin']} to Discord.")
+            return True
+        return False
+
+    def _update_limits(self, headers):
+        self.bucket = headers.get("X-RateLimit-Bucket", self.bucket)
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None and int(remaining) <= 0:
+            self.reset_at = max(self.reset_at, time.monotonic() + float(reset_after))
+
+    async def _post(self, payload: dict) -> bool:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        async with self._lock:
+            for _ in range(self.max_retries):
+                wait = self.reset_at - time.monotonic()
+                if wait > 0:
+                    metrics.observe("discord.rate_limit_wait", wait)
+                    await asyncio.sleep(wait)
+
+                with metrics.timer("discord.post") as timer:
+                    async with self.session.post(self.webhook_url, json=payload) as response:
+                        self._update_limits(response.headers)
+
+                        if response.status in (200, 204):
+                            return True
+
+                        if response.status == 429:
+                            timer.outcome = "throttled"
+                            try:
+                                data = await response.json(content_type=None)
+                            except (aiohttp.ContentTypeError, ValueError):
+                                data = {}
+                            retry_after = float(data.get("retry_after") or response.headers.get("Retry-After", 1))
+                            self.reset_at = time.monotonic() + retry_after
+                            logger.warning(f"Discord rate limited (bucket {self.bucket}), retrying in {retry_after:.2f}s.")
+                            continue
+
+                        timer.outcome = "error"
+                        text = await response.text()
+                        logger.error(f"Discord error: {response.status} - {text}")
+                        return False
+
+        return False
@@ -1,30 +1,47 @@
 # core/ean2asin.py
 
-from bs4 import BeautifulSoup
+import os
+from typing import Optional
+from .cache import DiskCache
+from .metrics import metrics
+from .parsers import parse, parse_search_asin
 from .requester import Requester
 
-async def convert(ean: str, cookie: str):
-    url = f"https://www.amazon.fr/s?k={ean}"
-    referrer = "https://www.amazon.fr/"
+AMAZON_URL = os.getenv("AMAZON_URL", "https://www.amazon.fr")
+
+HIT_TTL = 90 * 24 * 3600
+MISS_TTL = 3 * 24 * 3600
+
+
+async def search(ean: str, cookie: str) -> tuple:
+    """
+    Searches amazon.fr for an EAN. Returns `(completed, asin)`, where
+    `completed` is False when the request was blocked or failed.
+    """
+    url = f"{AMAZON_URL}/s?k={ean}"
+    referrer = f"{AMAZON_URL}/"
 
     async with Requester(url=url, referrer=referrer, cookie=cookie) as scraper:
         response = await scraper.fetch_get()
 
         if not response or response.status_code != 200:
             print(f"{ean} - Blocked or request failed.")
-            return None
+            return False, None
+
+        asin = await parse(parse_search_asin, response.content)
+        return True, asin
 
-        html = response.content.decode("utf-8", errors="ignore")
-        soup = BeautifulSoup(html, "lxml")
 
-        products = soup.find_all("div", attrs={"data-component-type": "s-search-result"})
+@metrics.timed("ean2asin.convert")
+async def convert(ean: str, cookie: str, cache: Optional[DiskCache] = None):
+    if cache:
+        found, asin = cache.get(ean)
+        if found:
+            return asin
 
-        for product in products:
-            if product.find(name="span", string="Sponsored"):
-                continue
+    completed, asin = await search(ean, cookie)
 
-            asin = product.get("data-asin")
-            if asin and len(asin) == 10:
-                return asin
+    if cache and completed:
+        cache.set(ean, asin, HIT_TTL if asin else MISS_TTL)
 
-        return None
+    return asin
@@ -0,0 +1,78 @@
+# core/feed.py
+
+import codecs
+import json
+from typing import AsyncIterator
+
+
+class JsonArrayParser:
+    """
+    Incremental parser for a top-level JSON array of objects.
+
+    Feed it raw byte chunks as they arrive; each call returns the elements
+    completed so far, so memory stays bounded by one element plus one chunk.
+    """
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.finished = False
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+            self.pos += 1
+
+    def feed(self, chunk: bytes) -> list:
+        self.buffer = self.buffer[self.pos:] + self.utf8.decode(chunk)
+        self.pos = 0
+        items = []
+
+        while not self.finished:
+            self._skip_whitespace()
+            if self.pos >= len(self.buffer):
+                break
+
+            char = self.buffer[self.pos]
+
+            if not self.started:
+                if char != "[":
+                    raise ValueError("Feed is not a JSON array.")
+                self.started = True
+                self.pos += 1
+                continue
+
+            if char == ",":
+                self.pos += 1
+                continue
+
+            if char == "]":
+                self.finished = True
+                self.pos += 1
+                break
+
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                break
+
+            items.append(item)
+            self.pos = end
+
+        return items
+
+    def close(self):
+        if not self.finished:
+            raise ValueError("Feed ended before the closing bracket.")
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]):
+    parser = JsonArrayParser()
+
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+
+    parser.close()
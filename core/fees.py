@@ -0,0 +1,159 @@
+# core/fees.py
+
+import random
+from typing import Optional
+from .cache import DiskCache
+from .logger import get_logger
+
+logger = get_logger("FeeModel")
+
+FULFILLMENT_TTL = 30 * 24 * 3600
+
+# Amazon.fr referral fees by glProductGroupName: (rate, rate above threshold, threshold).
+REFERRAL_RATES = {
+    "gl_beauty": (0.08, 0.15, 10.0),
+    "gl_drugstore": (0.08, 0.15, 10.0),
+    "gl_health_personal_care": (0.08, 0.15, 10.0),
+    "gl_grocery": (0.08, 0.15, 10.0),
+    "gl_baby_product": (0.08, 0.15, 10.0),
+    "gl_luxury_beauty": (0.15, 0.15, 0.0),
+    "gl_personal_care_appliances": (0.15, 0.15, 0.0),
+    "gl_pet_products": (0.15, 0.15, 0.0),
+    "gl_toy": (0.15, 0.15, 0.0),
+    "gl_home": (0.15, 0.15, 0.0),
+    "gl_kitchen": (0.15, 0.15, 0.0),
+    "gl_sports": (0.15, 0.15, 0.0),
+    "gl_apparel": (0.15, 0.15, 0.0),
+    "gl_book": (0.15, 0.15, 0.0),
+    "gl_music": (0.15, 0.15, 0.0),
+    "gl_dvd": (0.15, 0.15, 0.0),
+    "gl_video_games": (0.15, 0.15, 0.0),
+    "gl_software": (0.15, 0.15, 0.0),
+    "gl_electronics": (0.07, 0.07, 0.0),
+    "gl_pc": (0.07, 0.07, 0.0),
+    "gl_camera": (0.07, 0.07, 0.0),
+}
+DEFAULT_REFERRAL_RATE = (0.15, 0.15, 0.0)
+# Cheapest rate of any category, for fee floors of products whose gl is unknown.
+LOWEST_REFERRAL_RATE = min(min(rate, high_rate) for rate, high_rate, _ in REFERRAL_RATES.values())
+MIN_REFERRAL_FEE = 0.30
+
+# Variable closing fee charged on media categories.
+CLOSING_FEES = {
+    "gl_book": 0.81,
+    "gl_music": 0.81,
+    "gl_dvd": 0.81,
+    "gl_video": 0.81,
+    "gl_video_games": 0.81,
+    "gl_software": 0.81,
+}
+
+# Digital services taxes passed on by Amazon, as a share of its fees.
+DIGITAL_SERVICES_RATES = {
+    "FR": 0.03,
+    "IT": 0.03,
+    "ES": 0.03,
+}
+
+LEARNED_FIELDS = ("storage", "fulfillment", "fixed_closing")
+
+
+class FeeModel:
+    """
+    Computes Amazon fees locally from referral/closing tables and a per-ASIN
+    cache of the price-independent parts (FBA fulfillment, storage) learned
+    from earlier getfees responses.
+
+    The remote endpoint is only called on a cache miss, plus a random
+    `sample_rate` share of lookups used to validate the local model.
+    """
+
+    def __init__(self, seller_central, cache: DiskCache, sample_rate: float = 0.05, tolerance: float = 0.05):
+        self.seller_central = seller_central
+        self.cache = cache
+        self.marketplace = seller_central.country_code
+        self.digital_services_rate = DIGITAL_SERVICES_RATES.get(self.marketplace, 0.0)
+        self.sample_rate = sample_rate
+        self.tolerance = tolerance
+
+        self.local = 0
+        self.remote = 0
+        self.validated = 0
+        self.drifted = 0
+
+    @staticmethod
+    def referral_fee(gl: str, price: float) -> float:
+        rate, high_rate, threshold = REFERRAL_RATES.get(gl, DEFAULT_REFERRAL_RATE)
+        fee = price * (high_rate if price > threshold else rate)
+        return max(fee, MIN_REFERRAL_FEE)
+
+    @staticmethod
+    def closing_fee(gl: str) -> float:
+        return CLOSING_FEES.get(gl, 0.0)
+
+    def compute(self, gl: str, price: float, learned: dict) -> float:
+        referral = self.referral_fee(gl, price)
+        closing = self.closing_fee(gl) + learned.get("fixed_closing", 0.0)
+        fulfillment = learned.get("fulfillment", 0.0)
+        digital_services = (referral + closing + fulfillment) * self.digital_services_rate
+
+        total = referral + closing + fulfillment + learned.get("storage", 0.0) + digital_services
+        return round(total, 2)
+
+    def fee_floor(self, gl: str, price: float) -> float:
+        """
+        Lower bound on total fees for a product in `gl` at `price`, whatever
+        its size, so callers can prune before fetching the real fees.
+
+        Only the referral and closing fees count: fulfillment can be zero, and
+        an unknown `gl` may be any category, so it gets the cheapest rate.
+        """
+        if gl in REFERRAL_RATES:
+            referral = self.referral_fee(gl, price)
+        else:
+            referral = max(price * LOWEST_REFERRAL_RATE, MIN_REFERRAL_FEE)
+        return (referral + self.closing_fee(gl)) * (1 + self.digital_services_rate)
+
+    def learned(self, asin: str) -> Optional[dict]:
+        """
+        The price-independent fee parts learned for `asin`, if any.
+        """
+        found, learned = self.cache.get(self.seller_central.cache_key(asin))
+        return learned if found else None
+
+    def estimate(self, asin: str, gl: str, price: float) -> Optional[float]:
+        learned = self.learned(asin)
+        if learned is None:
+            return None
+        return self.compute(gl, price, learned)
+
+    async def get_fees(self, asin: str, gl: str, price: float) -> Optional[float]:
+        local = self.estimate(asin, gl, price)
+
+        if local is not None and random.random() >= self.sample_rate:
+            self.local += 1
+            return local
+
+        breakdown = await self.seller_central.get_fee_breakdown(asin, gl, price)
+        if breakdown is None:
+            return local
+
+        self.remote += 1
+        self.cache.set(self.seller_central.cache_key(asin), {k: breakdown[k] for k in LEARNED_FIELDS}, FULFILLMENT_TTL)
+        remote = round(sum(breakdown.values()), 2)
+
+        if local is not None:
+            self.validated += 1
+            if abs(local - remote) > self.tolerance:
+                self.drifted += 1
+                logger.warning(f"Fee model drift for ASIN {asin} ({self.marketplace}, {gl}): local €{local:.2f}, remote €{remote:.2f}.")
+
+        return remote
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local,
+            "remote": self.remote,
+            "validated": self.validated,
+            "drifted": self.drifted,
+        }
@@ -0,0 +1,192 @@
+# core/fetch_cache.py
+
+import os
+import json
+import tempfile
+from contextlib import aclosing
+from typing import Callable, Optional
+import aiohttp
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger("FetchCache")
+
+DOWNLOAD_DIR = "data/cache/downloads"
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchCache:
+    """
+    Keeps the last good copy of remote files on disk with their ETag and
+    Last-Modified validators.
+
+    Fetches are conditional, so an unchanged file costs a 304 and no
+    download. A failed fetch (network error, bad status or a body rejected by
+    `validate`) falls back to the last good copy when there is one.
+    """
+
+    def __init__(self, directory: str = DOWNLOAD_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_meta(self, name: str) -> dict:
+        try:
+            with open(self.path(name) + ".meta", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, name: str, meta: dict):
+        with open(self.path(name) + ".meta", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _conditional_headers(self, url: str, name: str) -> dict:
+        meta = self._load_meta(name) if os.path.exists(self.path(name)) else {}
+
+        headers = {}
+        if meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def cached(self, name: str) -> Optional[str]:
+        """
+        Path of the last good copy of `name`, or None if there is none.
+        """
+        path = self.path(name)
+        return path if os.path.exists(path) else None
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        name: str,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
+        """
+        Refreshes `name` from `url` and returns the path of the freshest good
+        copy, or None if there is none.
+        """
+        path = self.path(name)
+        cached = os.path.exists(path)
+        headers = self._conditional_headers(url, name)
+
+        with metrics.timer(f"fetch.{name}") as timer:
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        timer.outcome = "not_modified"
+                        logger.info(f"{name} not modified since the last fetch.")
+                        return path
+
+                    if response.status != 200:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+
+                    chunks = metrics.count_bytes(f"bytes.{name}", response.content.iter_chunked(CHUNK_SIZE))
+                    await self._store(path, chunks, validate)
+
+                    self._save_meta(name, {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    })
+                    logger.info(f"Downloaded {name} ({os.path.getsize(path)} bytes).")
+                    return path
+
+            except Exception as e:
+                if not cached:
+                    timer.outcome = "error"
+                    logger.error(f"Failed to fetch {name}: {str(e) or type(e).__name__}, and no cached copy to fall back on.")
+                    return None
+
+                timer.outcome = "stale"
+                logger.warning(f"Failed to fetch {name}: {str(e) or type(e).__name__}. Using the last good copy.")
+                return path
+
+    async def stream(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        name: str,
+        validate: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Like fetch(), but yields the body while it downloads (or the stored
+        copy when it is not modified), so callers can process it as it
+        arrives. The download only replaces the last good copy once it is
+        complete and valid. Failures are raised: by then part of the body may
+        have been consumed, so falling back to cached() is up to the caller.
+        """
+        path = self.path(name)
+        headers = self._conditional_headers(url, name)
+
+        with metrics.timer(f"fetch.{name}") as timer:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and os.path.exists(path):
+                    timer.outcome = "not_modified"
+                    logger.info(f"{name} not modified since the last fetch.")
+                    async with aclosing(read_chunks(path)) as chunks:
+                        async for chunk in chunks:
+                            yield chunk
+                    return
+
+                if response.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history, status=response.status
+                    )
+
+                chunks = metrics.count_bytes(f"bytes.{name}", response.content.iter_chunked(CHUNK_SIZE))
+                # Closed explicitly so an abandoned download drops its temp file at once.
+                async with aclosing(self._tee(path, chunks, validate)) as body:
+                    async for chunk in body:
+                        yield chunk
+
+                self._save_meta(name, {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                })
+                logger.info(f"Downloaded {name} ({os.path.getsize(path)} bytes).")
+
+    async def _store(self, path: str, chunks, validate: Optional[Callable[[str], bool]]):
+        async for _ in self._tee(path, chunks, validate):
+            pass
+
+    async def _tee(self, path: str, chunks, validate: Optional[Callable[[str], bool]]):
+        """
+        Writes the body to a temp file while passing its chunks on, and swaps
+        it in only once it is complete and valid.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+
+            if validate and not validate(tmp_path):
+                raise ValueError("downloaded body failed validation")
+
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+async def read_chunks(path: str, size: int = CHUNK_SIZE):
+    """
+    Yields the contents of a local file in chunks, like a streamed response.
+    """
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
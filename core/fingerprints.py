@@ -0,0 +1,90 @@
+# core/fingerprints.py
+
+import time
+import zlib
+from datetime import date
+from typing import Optional
+from .cache import DiskCache
+from .logger import get_logger
+
+logger = get_logger("Fingerprints")
+
+DAY = 24 * 3600
+
+
+class FingerprintStore:
+    """
+    Remembers, per EAN, the feed data a product was last evaluated with and
+    the verdict it got, so unchanged products can skip re-evaluation.
+
+    A product is re-evaluated when it is new, when its supplier price or link
+    or the evaluation `scope` (e.g. the marketplace list) changed, when its
+    last evaluation is older than `refresh_days`, or when it falls in today's
+    rolling slice (1/`refresh_days` of all EANs per day).
+    """
+
+    def __init__(self, cache: DiskCache, refresh_days: int = 7, full: bool = False, scope: str = ""):
+        self.cache = cache
+        self.refresh_days = refresh_days
+        self.full = full
+        self.scope = scope
+        self.today_slice = date.today().toordinal() % refresh_days
+
+        self.new = 0
+        self.changed = 0
+        self.stale = 0
+        self.unchanged = 0
+
+    def _in_today_slice(self, ean: str) -> bool:
+        return zlib.crc32(ean.encode()) % self.refresh_days == self.today_slice
+
+    def lookup(self, ean: str, price: float, link: str) -> Optional[dict]:
+        """
+        Returns the stored fingerprint when its verdict can be carried
+        forward, or None when the product has to be evaluated again.
+        """
+        if self.full:
+            return None
+
+        found, fingerprint, age = self.cache.get_with_age(ean)
+
+        if not found:
+            self.new += 1
+            return None
+
+        if (
+            fingerprint["price"] != round(price, 4)
+            or fingerprint["link"] != link
+            or fingerprint.get("scope", "") != self.scope
+        ):
+            self.changed += 1
+            return None
+
+        if age > self.refresh_days * DAY or (age > DAY / 2 and self._in_today_slice(ean)):
+            self.stale += 1
+            return None
+
+        self.unchanged += 1
+        return fingerprint
+
+    def record(self, ean: str, price: float, link: str, verdict: str, deal: Optional[dict] = None):
+        self.cache.set(
+            ean,
+            {
+                "price": round(price, 4),
+                "link": link,
+                "scope": self.scope,
+                "verdict": verdict,
+                "deal": deal,
+                "evaluated_at": time.time(),
+            },
+            self.refresh_days * 2 * DAY,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "new": self.new,
+            "changed": self.changed,
+            "stale": self.stale,
+            "unchanged": self.unchanged,
+        }
@@ -0,0 +1,172 @@
+# core/inputs.py
+
+import os
+import time
+import sqlite3
+from typing import Callable, Optional
+from .logger import get_logger
+
+logger = get_logger("InputStore")
+
+INPUTS_PATH = "data/cache/inputs.db"
+
+# Per (EAN, marketplace) inputs of the last evaluation, accepted or not.
+COLUMNS = (
+    "ean",
+    "marketplace",
+    "asin",
+    "name",
+    "gl",
+    "image_url",
+    "supplier_link",
+    "supplier_price",
+    "amazon_price",
+    "storage",
+    "fulfillment",
+    "fixed_closing",
+    "fees",
+    "sales",
+    "verdict",
+    "evaluated_at",
+    "seen_at",
+)
+
+
+class InputStore:
+    """
+    Raw scoring inputs of every evaluated product, for offline re-scoring.
+
+    One row per product and marketplace holds the supplier price (before
+    VAT), the Amazon price, the price-independent fee parts learned for the
+    ASIN, the observed total fees and the monthly sales, whichever of these
+    the scan got to before the product was accepted or rejected.
+
+    `seen_at` is refreshed for every product still in the feed, including
+    those carried forward unevaluated, so rows of delisted products and
+    dropped marketplaces can be pruned after a complete scan.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS inputs (
+            ean TEXT NOT NULL,
+            marketplace TEXT NOT NULL,
+            asin TEXT NOT NULL,
+            name TEXT,
+            gl TEXT,
+            image_url TEXT,
+            supplier_link TEXT,
+            supplier_price REAL NOT NULL,
+            amazon_price REAL NOT NULL,
+            storage REAL,
+            fulfillment REAL,
+            fixed_closing REAL,
+            fees REAL,
+            sales REAL,
+            verdict TEXT,
+            evaluated_at REAL NOT NULL,
+            seen_at REAL,
+            PRIMARY KEY (ean, marketplace)
+        );
+    """
+
+    def __init__(self, path: str = INPUTS_PATH, batch_size: int = 500):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.touched = []
+        self.recorded = 0
+
+        # Shards share the file; give concurrent writers time to take turns.
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(inputs)")}
+        if "seen_at" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE inputs ADD COLUMN seen_at REAL")
+                self.conn.execute("UPDATE inputs SET seen_at = evaluated_at")
+
+    def record(self, rows: list):
+        """
+        Queues rows (dicts keyed by COLUMNS) and writes them in batches.
+        """
+        now = time.time()
+        for row in rows:
+            row.setdefault("evaluated_at", now)
+            row.setdefault("seen_at", now)
+            self.pending.append(tuple(row.get(column) for column in COLUMNS))
+
+        if len(self.pending) + len(self.touched) >= self.batch_size:
+            self.flush()
+
+    def touch(self, ean: str, marketplaces: tuple):
+        """
+        Marks the rows of a product still in the feed as seen by this scan.
+        """
+        now = time.time()
+        self.touched.extend((now, ean, marketplace) for marketplace in marketplaces)
+
+        if len(self.pending) + len(self.touched) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending and not self.touched:
+            return
+
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO inputs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                self.pending,
+            )
+            self.conn.executemany(
+                "UPDATE inputs SET seen_at = MAX(COALESCE(seen_at, 0), ?) WHERE ean = ? AND marketplace = ?",
+                self.touched,
+            )
+        self.recorded += len(self.pending)
+        self.pending = []
+        self.touched = []
+
+    def prune(self, seen_before: float, owns: Optional[Callable[[str], bool]] = None) -> int:
+        """
+        Deletes the rows not seen since `seen_before` (the start of a complete
+        scan), limited to the EANs `owns` accepts when a shard only saw part
+        of the feed. Returns the number of rows deleted.
+        """
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT ean, marketplace FROM inputs WHERE seen_at IS NULL OR seen_at < ?", (seen_before,)
+        ).fetchall()
+        if owns:
+            rows = [row for row in rows if owns(row[0])]
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM inputs WHERE ean = ? AND marketplace = ?", rows)
+        if rows:
+            logger.info(f"Pruned inputs of {len(rows)} product/marketplace pairs no longer in the feed.")
+        return len(rows)
+
+    def load(self, max_age: Optional[float] = None) -> dict:
+        """
+        Returns every row (seen within `max_age` seconds, if given) as
+        columns: a dict of column name to tuple.
+        """
+        self.flush()
+        seen_since = time.time() - max_age if max_age is not None else 0
+        rows = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM inputs WHERE COALESCE(seen_at, evaluated_at) >= ?", (seen_since,)
+        ).fetchall()
+        columns = list(zip(*rows)) or [()] * len(COLUMNS)
+        return dict(zip(COLUMNS, columns))
+
+    def close(self):
+        if not self.conn:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+        if self.recorded:
+            logger.info(f"Recorded inputs for {self.recorded} product/marketplace pairs.")
@@ -0,0 +1,61 @@
+# core/journal.py
+
+import os
+import json
+from typing import Optional
+from .cache import CACHE_DIR
+from .logger import get_logger
+
+logger = get_logger("Journal")
+
+JOURNAL_PATH = os.path.join(CACHE_DIR, "scan_journal.jsonl")
+
+
+class ScanJournal:
+    """
+    Append-only JSON Lines record of scan progress.
+
+    Every stage a product passes is checkpointed with the product's
+    intermediate state, and finished products are recorded with their
+    verdict (and deal, if accepted), so an interrupted scan can be resumed.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.file = None
+
+    def load(self) -> dict:
+        """
+        Returns the latest record per EAN from an existing journal.
+        """
+        records = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line may be cut off by the crash we are resuming from.
+                        continue
+                    records[record["ean"]] = record
+        except FileNotFoundError:
+            pass
+        return records
+
+    def open(self, resume: bool):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8", buffering=1)
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record) + "\n")
+
+    def checkpoint(self, item: dict, stage: str):
+        self._write({"ean": item["ean"], "stage": stage, "item": item})
+
+    def finish(self, ean: str, verdict: str, deal: Optional[dict] = None):
+        self._write({"ean": ean, "done": True, "verdict": verdict, "deal": deal})
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,29 @@
+# core/marketplaces.py
+
+# Seller Central country code: Amazon domain. All of these sell in EUR.
+MARKETPLACES = {
+    "FR": "amazon.fr",
+    "DE": "amazon.de",
+    "IT": "amazon.it",
+    "ES": "amazon.es",
+}
+DEFAULT_MARKETPLACE = "FR"
+
+
+def parse_marketplaces(value: str) -> tuple:
+    """
+    Parses a comma-separated marketplace list such as `FR,DE,IT`. The first
+    one is the primary marketplace, used for product metadata.
+    """
+    codes = []
+    for code in (part.strip().upper() for part in value.split(",")):
+        if not code:
+            continue
+        if code not in MARKETPLACES:
+            raise ValueError(f"Unknown marketplace '{code}', expected some of {', '.join(MARKETPLACES)}.")
+        if code not in codes:
+            codes.append(code)
+
+    if not codes:
+        raise ValueError(f"Invalid marketplaces '{value}', expected e.g. FR,DE.")
+    return tuple(codes)
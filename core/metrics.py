@@ -0,0 +1,198 @@
+# core/metrics.py
+
+import os
+import json
+import time
+import random
+import functools
+from datetime import datetime, timezone
+from .logger import get_logger
+
+logger = get_logger("Metrics")
+
+REPORT_DIR = "data/reports"
+MAX_SAMPLES = 10_000
+
+OK = "ok"
+EMPTY = "empty"
+ERROR = "error"
+
+
+class Histogram:
+    """
+    Latency histogram over a bounded uniform sample of observations, so
+    percentiles stay cheap however many calls a run makes.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.samples = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+        if len(self.samples) < self.max_samples:
+            self.samples.append(value)
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.max_samples:
+                self.samples[slot] = value
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pick(p):
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(pick(50) * 1000, 2),
+            "p95_ms": round(pick(95) * 1000, 2),
+            "p99_ms": round(pick(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class Timer:
+    """
+    Context manager timing one call of `name`. The outcome defaults to "ok",
+    or "error" if the block raises, and callers may set it to anything else
+    (e.g. "miss", "throttled") before the block ends.
+    """
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+        self.outcome = OK
+        self.start = 0.0
+
+    def __enter__(self):
+        self.metrics.enter(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.outcome == OK:
+            self.outcome = ERROR
+        self.metrics.leave(self.name, time.perf_counter() - self.start, self.outcome)
+        return False
+
+
+class Metrics:
+    """
+    Process-wide timers, counters and in-flight gauges.
+
+    Names are dotted, `component.operation` (e.g. `seller_central.get_fees`,
+    `http.www.amazon.fr`, `stage.fees`). Each timed name gets a latency
+    histogram, outcome counts and a current/peak in-flight gauge.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.histograms = {}
+        self.outcomes = {}
+        self.counters = {}
+        self.inflight = {}
+        self.peak_inflight = {}
+
+    def timer(self, name: str) -> Timer:
+        return Timer(self, name)
+
+    def timed(self, name: str):
+        """
+        Decorator timing every call of a coroutine function. Calls returning
+        None are counted with the "empty" outcome.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.timer(name) as timer:
+                    result = await func(*args, **kwargs)
+                    if result is None:
+                        timer.outcome = EMPTY
+                    return result
+            return wrapper
+        return decorator
+
+    def enter(self, name: str):
+        current = self.inflight.get(name, 0) + 1
+        self.inflight[name] = current
+        self.peak_inflight[name] = max(self.peak_inflight.get(name, 0), current)
+
+    def leave(self, name: str, elapsed: float, outcome: str = OK):
+        self.inflight[name] -= 1
+        self.observe(name, elapsed, outcome)
+
+    def observe(self, name: str, elapsed: float, outcome: str = OK):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(elapsed)
+
+        outcomes = self.outcomes.setdefault(name, {})
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def incr(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    async def count_bytes(self, name: str, chunks):
+        """
+        Passes an async iterator of byte chunks through, adding their sizes
+        to the `name` counter.
+        """
+        async for chunk in chunks:
+            self.incr(name, len(chunk))
+            yield chunk
+
+    def report(self, **extra) -> dict:
+        timers = {}
+        for name, histogram in sorted(self.histograms.items()):
+            timers[name] = histogram.summary()
+            timers[name]["outcomes"] = self.outcomes.get(name, {})
+            timers[name]["peak_inflight"] = self.peak_inflight.get(name, 0)
+
+        report = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "duration_s": round(time.monotonic() - self.started, 2),
+            "timers": timers,
+            "counters": dict(sorted(self.counters.items())),
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, run: str, directory: str = REPORT_DIR, **extra) -> str:
+        """
+        Writes the JSON report of this run to `<directory>/<run>.json`, logs
+        the human summary and returns the report path.
+        """
+        report = self.report(run=run, **extra)
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{run}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        self.log_summary(report)
+        logger.info(f"Performance report written to {path}.")
+        return path
+
+    @staticmethod
+    def log_summary(report: dict):
+        logger.info(f"Run took {report['duration_s']:.1f}s.")
+        for name, timer in report["timers"].items():
+            outcomes = ", ".join(f"{k} {v}" for k, v in sorted(timer["outcomes"].items()))
+            logger.info(
+                f"{name}: {timer['count']} calls ({outcomes}), p50 {timer['p50_ms']:.0f}ms, "
+                f"p95 {timer['p95_ms']:.0f}ms, p99 {timer['p99_ms']:.0f}ms, peak in-flight {timer['peak_inflight']}"
+            )
+        for name, value in report["counters"].items():
+            logger.info(f"{name}: {value}")
+
+
+metrics = Metrics()
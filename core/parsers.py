@@ -0,0 +1,97 @@
+# core/parsers.py
+
+import os
+import re
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+from lxml import etree, html as lxml_html
+
+SEARCH_RESULTS = '//div[@data-component-type="s-search-result"]'
+SPONSORED = './/span[normalize-space(text())="Sponsored"]'
+
+SALES_SPAN = re.compile(
+    rb'<span[^>]*class="[^"]*\bestimated_sales_per_mo\b[^"]*"[^>]*>(.*?)</span>',
+    re.DOTALL,
+)
+TAGS = re.compile(rb"<[^>]+>")
+
+
+def parse_search_asin(content: bytes) -> Optional[str]:
+    """
+    Returns the ASIN of the first organic (non-sponsored) result on an Amazon
+    search page.
+    """
+    if not content:
+        return None
+
+    try:
+        tree = lxml_html.fromstring(content)
+    except etree.ParserError:
+        return None
+
+    for product in tree.xpath(SEARCH_RESULTS):
+        if product.xpath(SPONSORED):
+            continue
+
+        asin = product.get("data-asin")
+        if asin and len(asin) == 10:
+            return asin
+
+    return None
+
+
+def parse_sales(content: bytes) -> tuple:
+    """
+    Pulls the monthly sales estimate out of a SAS lookup page without
+    building a DOM. Returns `(found, sales)`, where `found` tells whether the
+    sales span was present at all.
+    """
+    match = SALES_SPAN.search(content)
+    if not match:
+        return False, None
+
+    text = TAGS.sub(b"", match.group(1)).strip().replace(b",", b"")
+    number = re.search(rb"\d+", text)
+
+    if not number:
+        return True, None
+
+    return True, float(number.group())
+
+
+class ParserPool:
+    """
+    Runs HTML extraction functions in worker processes so parsing never
+    blocks the event loop. With zero workers they run inline instead.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, func: Callable, content: bytes):
+        if self.workers <= 0:
+            return func(content)
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, content)
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+
+_pool = ParserPool(workers=int(os.getenv("PARSER_WORKERS", str(min(4, os.cpu_count() or 1)))))
+
+
+async def parse(func: Callable, content: bytes):
+    return await _pool.run(func, content)
+
+
+def close_parsers():
+    _pool.close()
@@ -0,0 +1,80 @@
+# core/pipeline.py
+
+from typing import Awaitable, Callable, Optional
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger("Pipeline")
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[..., Awaitable[bool]]):
+        self.name = name
+        self.func = func
+        self.entered = 0
+        self.rejected = 0
+        self.errors = 0
+
+
+class Pipeline:
+    """
+    Ordered list of async filter stages, cheapest first.
+
+    Each stage takes `(item, ctx)`, may enrich `item` and returns False to
+    reject it. Evaluation stops at the first rejection, and per-stage
+    entered/rejected/error counts are kept for the end-of-run summary, with
+    stage latencies recorded in `core.metrics`.
+    """
+
+    def __init__(self, stages: list):
+        self.stages = [Stage(name, func) for name, func in stages]
+        self.accepted = 0
+
+    async def run(self, item: dict, ctx, after: Optional[str] = None, on_pass: Optional[Callable] = None) -> Optional[str]:
+        """
+        Runs `item` through the stages and returns the name of the rejecting
+        stage, or None if it passed them all. `after` resumes past an already
+        completed stage, and `on_pass(item, stage_name)` is called after each
+        stage the item passes.
+        """
+        stages = self.stages
+        if after is not None:
+            names = [stage.name for stage in stages]
+            stages = stages[names.index(after) + 1:]
+
+        for stage in stages:
+            stage.entered += 1
+            try:
+                with metrics.timer(f"stage.{stage.name}") as timer:
+                    passed = await stage.func(item, ctx)
+                    timer.outcome = "passed" if passed else "rejected"
+            except Exception:
+                stage.errors += 1
+                raise
+
+            if not passed:
+                stage.rejected += 1
+                return stage.name
+
+            if on_pass:
+                on_pass(item, stage.name)
+
+        self.accepted += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            stage.name: {
+                "entered": stage.entered,
+                "rejected": stage.rejected,
+                "errors": stage.errors,
+            }
+            for stage in self.stages
+        }
+
+    def log_summary(self):
+        for stage in self.stages:
+            logger.info(
+                f"Stage {stage.name}: entered {stage.entered}, rejected {stage.rejected}, errors {stage.errors}."
+            )
+        logger.info(f"Accepted {self.accepted} products.")
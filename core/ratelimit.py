@@ -0,0 +1,170 @@
+# core/ratelimit.py
+
+import os
+import time
+import random
+import asyncio
+from .logger import get_logger
+
+logger = get_logger("RateLimiter")
+
+# host: (requests per second, max concurrent requests)
+HOST_LIMITS = {
+    "www.amazon.fr": (5.0, 20),
+    "sellercentral-europe.amazon.com": (10.0, 30),
+    "sas.selleramp.com": (5.0, 10),
+}
+DEFAULT_LIMITS = (10.0, 50)
+
+
+def parse_limits(spec: str) -> dict:
+    """
+    Parses `host=rate:concurrency` pairs separated by commas, as given in the
+    RATE_LIMITS environment variable.
+    """
+    limits = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, values = pair.partition("=")
+        rate, _, concurrency = values.partition(":")
+        limits[host.strip()] = (float(rate), int(concurrency))
+    return limits
+
+
+HOST_LIMITS.update(parse_limits(os.getenv("RATE_LIMITS", "")))
+
+# Number of processes sharing these limits (set for local shard processes);
+# each gets an equal slice of every host's rate and concurrency.
+RATE_LIMIT_SHARE = max(1, int(os.getenv("RATE_LIMIT_SHARE", "1")))
+
+OK = "ok"
+THROTTLED = "throttled"
+ERROR = "error"
+
+
+def backoff(base: float, attempt: int, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter for the given 1-based attempt.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class HostLimiter:
+    """
+    Token bucket plus AIMD concurrency window for one host.
+
+    Healthy responses grow the window by roughly one slot per window's worth
+    of requests and nudge the rate back up. A throttled response (429/503 or
+    a captcha page) halves both.
+    """
+
+    def __init__(self, host: str, rate: float, max_concurrency: int):
+        self.host = host
+        self.max_rate = rate
+        self.min_rate = rate / 20
+        self.rate = rate
+        # At least one token of capacity, or a rate below 1/s could never acquire.
+        self.burst = max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+        self.max_limit = max_concurrency
+        self.limit = max(1.0, max_concurrency / 2)
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+        self.requests = 0
+        self.ok = 0
+        self.throttled = 0
+        self.errors = 0
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+        try:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        except asyncio.CancelledError:
+            # The caller never gets to release() a slot it did not finish acquiring.
+            await self._free_slot()
+            raise
+
+        self.requests += 1
+
+    async def release(self, outcome: str):
+        if outcome == OK:
+            self.ok += 1
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+        elif outcome == THROTTLED:
+            self.throttled += 1
+            self.limit = max(1.0, self.limit / 2)
+            self.rate = max(self.min_rate, self.rate / 2)
+            logger.warning(
+                f"{self.host} throttled: concurrency {self.limit:.1f}, rate {self.rate:.2f}/s."
+            )
+        else:
+            self.errors += 1
+
+        await self._free_slot()
+
+    async def _free_slot(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "concurrency": round(self.limit, 2),
+            "rate": round(self.rate, 2),
+        }
+
+
+class RateLimiter:
+    def __init__(self):
+        self.hosts = {}
+
+    def for_host(self, host: str) -> HostLimiter:
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            # `host/bucket` keys get their own limiter, with the host's limits unless listed;
+            # requests pass it and the host's own (see chain).
+            rate, concurrency = HOST_LIMITS.get(host) or HOST_LIMITS.get(host.split("/")[0], DEFAULT_LIMITS)
+            limiter = HostLimiter(host, rate / RATE_LIMIT_SHARE, max(1, concurrency // RATE_LIMIT_SHARE))
+            self.hosts[host] = limiter
+        return limiter
+
+    def chain(self, key: str) -> list:
+        """
+        Limiters a request to `key` must pass, in acquisition order. A
+        `host/bucket` key goes through its bucket and then the shared host
+        limiter, so buckets only narrow the host's limits, never add to them.
+        """
+        host = key.split("/")[0]
+        if host == key:
+            return [self.for_host(key)]
+        return [self.for_host(key), self.for_host(host)]
+
+    def metrics(self) -> dict:
+        return {host: limiter.metrics() for host, limiter in self.hosts.items()}
+
+    def log_summary(self):
+        for host, metrics in self.metrics().items():
+            logger.info(f"{host}: {metrics}")
+
+
+limiter = RateLimiter()
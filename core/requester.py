@@ -3,20 +3,82 @@
 from typing import Optional
 import os
 import asyncio
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 from curl_cffi.requests import AsyncSession
+from .metrics import metrics
+from .ratelimit import limiter, backoff, OK, THROTTLED, ERROR
+
+
+THROTTLE_STATUSES = (429, 503)
+CAPTCHA_MARKERS = (b"validateCaptcha", b"/errors/captcha", b"Robot Check")
+
+
+def is_throttled(response) -> bool:
+    if response.status_code in THROTTLE_STATUSES:
+        return True
+    return any(marker in response.content[:20000] for marker in CAPTCHA_MARKERS)
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
+
+
+class SessionPool:
+    """
+    Shared curl_cffi sessions, one per (host, cookie, proxy), kept alive for
+    the whole run so requests reuse multiplexed HTTP/2 connections.
+    """
+
+    def __init__(self, max_clients: int = 10):
+        self.max_clients = max_clients
+        self.sessions = {}
+
+    def get(self, host: str, cookie: Optional[str], proxy: Optional[str]) -> AsyncSession:
+        key = (host, cookie, proxy)
+        session = self.sessions.get(key)
+
+        if session is None:
+            headers = {"User-Agent": USER_AGENT}
+            if cookie:
+                headers["Cookie"] = cookie
+
+            session = AsyncSession(
+                headers=headers,
+                proxy=proxy,
+                impersonate="chrome142",
+                allow_redirects=True,
+                http_version="v2",
+                max_clients=self.max_clients,
+            )
+            self.sessions[key] = session
+
+        return session
+
+    async def close(self):
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        for session in sessions:
+            await session.close()
+
+
+_pool = SessionPool(max_clients=int(os.getenv("REQUESTER_MAX_CLIENTS", "10")))
+
+
+async def close_sessions():
+    await _pool.close()
 
 
 class Requester:
-    def __init__(self, url: str, referrer: Optional[str] = None, cookie: Optional[str] = None, api: Optional[bool] = False, timeout: int = 10):
+    def __init__(self, url: str, referrer: Optional[str] = None, cookie: Optional[str] = None, api: Optional[bool] = False, timeout: int = 10, bucket: Optional[str] = None):
         self.url = url
+        self.host = urlsplit(url).netloc
+        # Requests to one host can be rate limited per bucket (e.g. per marketplace).
+        self.limit_key = f"{self.host}/{bucket}" if bucket else self.host
+        self.cookie = cookie
         self.session: Optional[AsyncSession] = None
         self.headers = {
             "Accept": "application/json" if api else "*/*",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
         }
-        if cookie:
-            self.headers["Cookie"] = cookie
         if referrer:
             self.headers["Referer"] = referrer
 
@@ -24,38 +86,50 @@ class Requester:
         self.timeout = timeout
 
     async def __aenter__(self):
-        self.session = AsyncSession(
-            headers=self.headers,
-            proxy=self.proxy,
-            impersonate="chrome142",
-            timeout=self.timeout,
-            allow_redirects=True,
-            http_version="v2"
-        )
+        self.session = _pool.get(self.host, self.cookie, self.proxy)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if self.session:
-            await self.session.close()
+        self.session = None
 
-    async def fetch_get(self, retries: int = 1, delay: float = 1.0):
-        for attempt in range(1, retries + 1):
-            try:
-                response = await self.session.get(self.url)
-                response.raise_for_status()
-                return response
-            except Exception as e:
-                if attempt < retries:
-                    await asyncio.sleep(delay)
-        return None
+    async def fetch_get(self, retries: int = 3, delay: float = 1.0):
+        return await self._fetch("GET", retries, delay)
+
+    async def fetch_post(self, data: dict, retries: int = 3, delay: float = 1.0):
+        return await self._fetch("POST", retries, delay, json=data)
+
+    async def _fetch(self, method: str, retries: int, delay: float, **kwargs):
+        limiters = limiter.chain(self.limit_key)
 
-    async def fetch_post(self, data: dict, retries: int = 1, delay: float = 1.0):
         for attempt in range(1, retries + 1):
+            acquired = []
+            outcome = ERROR
             try:
-                response = await self.session.post(self.url, json=data)
-                response.raise_for_status()
-                return response
-            except Exception as e:
-                if attempt < retries:
-                    await asyncio.sleep(delay)
+                for host_limiter in limiters:
+                    await host_limiter.acquire()
+                    acquired.append(host_limiter)
+
+                with metrics.timer(f"http.{self.limit_key}") as timer:
+                    response = await self.session.request(
+                        method, self.url, headers=self.headers, timeout=self.timeout, **kwargs
+                    )
+                    metrics.incr(f"bytes.{self.host}", len(response.content))
+                    if is_throttled(response):
+                        outcome = timer.outcome = THROTTLED
+                    elif 400 <= response.status_code < 500:
+                        # Any other client error will not go away on retry.
+                        timer.outcome = ERROR
+                        return None
+                    else:
+                        response.raise_for_status()
+                        outcome = OK
+                        return response
+            except Exception:
+                pass
+            finally:
+                for host_limiter in acquired:
+                    await host_limiter.release(outcome)
+
+            if attempt < retries:
+                await asyncio.sleep(backoff(delay, attempt))
         return None
@@ -1,40 +1,89 @@
 # core/sales_scraper.py
 
+import os
 import asyncio
 import re
-from bs4 import BeautifulSoup
+from typing import Optional
 from playwright.async_api import async_playwright
+from .cache import DiskCache
 from .logger import get_logger
+from .metrics import metrics
+from .parsers import parse, parse_sales
+from .requester import Requester
 
 logger = get_logger("Sales Scraper")
 
+SAS_URL = os.getenv("SAS_URL", "https://sas.selleramp.com")
+
 
 class SalesScraper:
+    """
+    Reads SellerAmp (SAS) monthly sales estimates.
+
+    The lookup page is fetched over the pooled HTTP client with the SAS
+    cookies first. Only when the value is not in the served HTML does it fall
+    back to a small pool of warm Chromium pages, launched on first use.
+
+    With a `cache`, estimates younger than `max_age` seconds are served
+    directly; older ones are still served but refreshed in the background.
+    """
+
     def __init__(
         self,
         cookies: list,
         max_pages: int = 10,
         headless: bool = False,
+        use_http: bool = True,
+        cache: Optional[DiskCache] = None,
+        max_age: float = 7 * 24 * 3600,
     ):
         self.cookies = cookies
-        self.base_url = "https://sas.selleramp.com/sas/lookup?src=web&SasLookup%5Bsearch_term%5D={}"
+        self.base_url = SAS_URL + "/sas/lookup?src=web&SasLookup%5Bsearch_term%5D={}"
         self.max_pages = max_pages
         self.headless = headless
+        self.use_http = use_http
+        self.cookie_header = "; ".join(
+            f"{c['name']}={c['value']}" for c in cookies or [] if "selleramp" in c.get("domain", "selleramp")
+        )
 
         self.playwright = None
         self.browser = None
         self.context = None
-        self.semaphore = asyncio.Semaphore(max_pages)
+        self.pages: Optional[asyncio.Queue] = None
+        self._browser_lock = asyncio.Lock()
+
+        self.cache = cache
+        self.max_age = max_age
+        self._refreshing = {}
+
+        self.http_hits = 0
+        self.browser_fallbacks = 0
+        self.stale_served = 0
 
     async def start(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless
-        )
-        self.context = await self.browser.new_context()
-        await self.context.add_cookies(self.cookies)
+        if not self.use_http:
+            await self._ensure_browser()
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self.context:
+                return
+
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless
+            )
+            self.context = await self.browser.new_context()
+            await self.context.add_cookies(self.cookies)
+
+            self.pages = asyncio.Queue()
+            for _ in range(self.max_pages):
+                self.pages.put_nowait(await self.context.new_page())
 
     async def close(self):
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
         if self.context:
             await self.context.close()
         if self.browser:
@@ -42,34 +91,108 @@ class SalesScraper:
         if self.playwright:
             await self.playwright.stop()
 
-    async def get_sales(self, asin: str):
-        async with self.semaphore:
-            page = await self.context.new_page()
-
-            try:
-                await page.goto(self.base_url.format(asin), timeout=60000)
-                await page.wait_for_load_state("domcontentloaded")
-
-                html = await page.content()
-                soup = BeautifulSoup(html, "lxml")
-
-                sales_tag = soup.find("span", class_="estimated_sales_per_mo")
-                if not sales_tag:
-                    return None
-
-                text = sales_tag.get_text(strip=True).replace(",", "")
-                match = re.search(r"\d+", text)
+        logger.info(
+            f"Sales lookups: {self.http_hits} over HTTP, {self.browser_fallbacks} via browser, "
+            f"{self.stale_served} served stale."
+        )
 
-                if not match:
-                    return None
+    @metrics.timed("sales.get_sales")
+    async def get_sales(self, asin: str):
+        if not self.cache:
+            return await self.fetch_sales(asin)
+
+        found, sales, age = self.cache.get_with_age(asin)
+        if not found:
+            return await self._refresh(asin)
+
+        if age > self.max_age:
+            self.stale_served += 1
+            if asin not in self._refreshing:
+                task = asyncio.ensure_future(self._refresh(asin))
+                self._refreshing[asin] = task
+                task.add_done_callback(lambda _: self._refreshing.pop(asin, None))
+
+        return sales
+
+    async def _refresh(self, asin: str):
+        sales = await self.fetch_sales(asin)
+        if sales is not None:
+            self.cache.set(asin, sales, self.max_age * 4)
+        return sales
+
+    async def fetch_sales(self, asin: str):
+        if self.use_http:
+            found, sales = await self._get_sales_http(asin)
+            if found:
+                self.http_hits += 1
+                return sales
+
+        self.browser_fallbacks += 1
+        return await self._get_sales_browser(asin)
+
+    @metrics.timed("sales.http")
+    async def _get_sales_http(self, asin: str) -> tuple:
+        try:
+            async with Requester(
+                url=self.base_url.format(asin),
+                referrer=f"{SAS_URL}/",
+                cookie=self.cookie_header,
+            ) as scraper:
+                response = await scraper.fetch_get()
+
+            if not response or response.status_code != 200:
+                return False, None
+
+            return await parse(parse_sales, response.content)
+
+        except Exception as e:
+            logger.warning(
+                f"{e} occurred while fetching sales over HTTP for ASIN: {asin}."
+            )
+            return False, None
+
+    @metrics.timed("sales.browser")
+    async def _get_sales_browser(self, asin: str):
+        await self._ensure_browser()
+        page = await self.pages.get()
+
+        try:
+            page = await self._live_page(page)
+            await page.goto(self.base_url.format(asin), timeout=60000, wait_until="domcontentloaded")
+
+            sales_tag = await page.query_selector("span.estimated_sales_per_mo")
+            if not sales_tag:
+                return None
 
-                return float(match.group())
+            text = (await sales_tag.inner_text()).strip().replace(",", "")
+            match = re.search(r"\d+", text)
 
-            except Exception as e:
-                logger.warning(
-                    f"{e} occurred while scraping sales for ASIN: {asin}."
-                )
+            if not match:
                 return None
 
-            finally:
-                await page.close()
\ No newline at end of file
+            return float(match.group())
+
+        except Exception as e:
+            logger.warning(
+                f"{e} occurred while scraping sales for ASIN: {asin}."
+            )
+            # Replaced by _live_page when it is next taken from the pool.
+            await page.close()
+            return None
+
+        finally:
+            self.pages.put_nowait(page)
+
+    async def _live_page(self, page):
+        """
+        Returns `page`, or a new page in its place if it was closed (after a
+        navigation error, or a crash while idle in the pool).
+        """
+        if not page.is_closed():
+            return page
+
+        try:
+            return await self.context.new_page()
+        except Exception as e:
+            logger.warning(f"Failed to replace a closed browser page: {e}.")
+            return page
@@ -0,0 +1,160 @@
+# core/scoring.py
+
+from typing import Optional
+import numpy as np
+from .fees import CLOSING_FEES, DEFAULT_REFERRAL_RATE, DIGITAL_SERVICES_RATES, MIN_REFERRAL_FEE, REFERRAL_RATES
+from .marketplaces import MARKETPLACES
+
+# Default deal criteria, shared by the scanner and offline re-scoring.
+VAT_RATE = 1.20
+MIN_ROI = 25
+MIN_PROFIT = 1
+MIN_SALES = 5
+
+
+def _floats(values) -> np.ndarray:
+    return np.array(values, dtype=float)
+
+
+def _factorize(values) -> tuple:
+    """
+    Distinct keys and, for every row, the index of its key among them.
+    """
+    return np.unique(np.array([value or "" for value in values], dtype=str), return_inverse=True)
+
+
+def _lookup(keys: tuple, table: dict, default) -> np.ndarray:
+    """
+    Maps every factorized key through `table` with one dict lookup per
+    distinct key.
+    """
+    unique, inverse = keys
+    values = np.array([table.get(str(key), default) for key in unique] or [default], dtype=float)
+    return values[inverse]
+
+
+def score(
+    columns: dict,
+    vat_rate: float = VAT_RATE,
+    fee_scale: float = 1.0,
+    fulfillment_delta: float = 0.0,
+    digital_services_rates: Optional[dict] = None,
+    missing_fulfillment: Optional[float] = None,
+) -> dict:
+    """
+    Recomputes fees, profit and ROI for every input row (see core.inputs) in
+    one vectorized pass.
+
+    Fees are modelled like core.fees.FeeModel: referral and closing fees from
+    the tables, fulfillment, storage and fixed closing from the parts learned
+    for the ASIN. Where the scan observed the real total, that is kept and only
+    the effect of the changed assumptions is added on top. Rows with neither
+    are left unscored (NaN) unless `missing_fulfillment` gives a fulfillment
+    fee to assume for them.
+    """
+    gl = _factorize(columns["gl"])
+    marketplace = _factorize(columns["marketplace"])
+    price = _floats(columns["amazon_price"])
+
+    rates = _lookup(gl, REFERRAL_RATES, DEFAULT_REFERRAL_RATE)
+    rate = np.where(price > rates[:, 2], rates[:, 1], rates[:, 0])
+    referral = np.maximum(price * rate, MIN_REFERRAL_FEE)
+
+    fulfillment = _floats(columns["fulfillment"])
+    storage = _floats(columns["storage"])
+    fixed_closing = _floats(columns["fixed_closing"])
+    if missing_fulfillment is not None:
+        missing = np.isnan(fulfillment)
+        fulfillment[missing] = missing_fulfillment
+        storage[missing & np.isnan(storage)] = 0.0
+        fixed_closing[missing & np.isnan(fixed_closing)] = 0.0
+    closing = _lookup(gl, CLOSING_FEES, 0.0) + fixed_closing
+
+    def model(fulfillment, digital_services_rates):
+        digital_services = (referral + closing + fulfillment) * _lookup(marketplace, digital_services_rates, 0.0)
+        return referral + closing + fulfillment + storage + digital_services
+
+    base = model(fulfillment, DIGITAL_SERVICES_RATES)
+    adjusted = model(
+        fulfillment + fulfillment_delta,
+        {**DIGITAL_SERVICES_RATES, **(digital_services_rates or {})},
+    )
+    observed = _floats(columns["fees"])
+    known = ~np.isnan(observed) & ~np.isnan(base)
+
+    # Rounded to the cent like the scanner's fees, so default settings reproduce its ROIs.
+    fees = np.round(np.where(known, observed + adjusted - base, adjusted) * fee_scale, 2)
+    supplier_cost = _floats(columns["supplier_price"]) * vat_rate
+    profit = price - fees - supplier_cost
+
+    return {
+        "supplier_cost": supplier_cost,
+        "fees": fees,
+        "profit": profit,
+        "roi": profit / supplier_cost * 100,
+        "scored": ~np.isnan(fees),
+    }
+
+
+def select(
+    columns: dict,
+    scores: dict,
+    min_roi: float = MIN_ROI,
+    min_profit: float = MIN_PROFIT,
+    min_sales: float = MIN_SALES,
+    marketplaces: Optional[tuple] = None,
+) -> tuple:
+    """
+    Picks the best-ROI marketplace row of every product, like the scanner,
+    and keeps those meeting the thresholds. Returns the selected row indices
+    and counts of why the other products fell out.
+    """
+    marketplace = np.array(columns["marketplace"], dtype=str)
+    ean = np.array(columns["ean"], dtype=str)
+    sales = _floats(columns["sales"])
+
+    candidates = scores["scored"] & np.isin(marketplace, list(marketplaces or MARKETPLACES))
+    rows = np.flatnonzero(candidates)
+
+    # Sort by EAN, then ROI descending; the first row of each EAN is its best marketplace.
+    order = rows[np.lexsort((-scores["roi"][rows], ean[rows]))]
+    _, first = np.unique(ean[order], return_index=True)
+    best = order[first]
+
+    roi_ok = (scores["roi"][best] >= min_roi) & (scores["profit"][best] >= min_profit)
+    sales_known = ~np.isnan(sales[best])
+    sales_ok = sales_known & (np.nan_to_num(sales[best]) >= min_sales)
+
+    stats = {
+        "rows": len(ean),
+        "unscored": int((~scores["scored"]).sum()),
+        "products": len(best),
+        "roi": int((~roi_ok).sum()),
+        "sales": int((roi_ok & sales_known & ~sales_ok).sum()),
+        "sales_unknown": int((roi_ok & ~sales_known).sum()),
+        "accepted": int((roi_ok & sales_ok).sum()),
+    }
+    return best[roi_ok & sales_ok], stats
+
+
+def build_deals(columns: dict, scores: dict, rows: np.ndarray) -> list:
+    """
+    Deal records, as the scanner saves them, for the selected rows.
+    """
+    deals = []
+    for i in rows.tolist():
+        deals.append({
+            "ean": columns["ean"][i],
+            "asin": columns["asin"][i],
+            "marketplace": columns["marketplace"][i],
+            "name": columns["name"][i],
+            "supplier_cost": float(scores["supplier_cost"][i]),
+            "amazon_price": float(columns["amazon_price"][i]),
+            "fees": float(scores["fees"][i]),
+            "profit": float(scores["profit"][i]),
+            "roi": float(scores["roi"][i]),
+            "estimated_sales": columns["sales"][i],
+            "supplier_link": columns["supplier_link"][i],
+            "image_url": columns["image_url"][i],
+        })
+    return deals
@@ -1,87 +1,141 @@
 # core/seller_central.py
 
+import os
+import asyncio
+from typing import Optional
 from .requester import Requester
 from datetime import datetime
 import json
+from .cache import DiskCache
 from .logger import get_logger
+from .marketplaces import DEFAULT_MARKETPLACE
+from .metrics import metrics
 
 logger = get_logger("SellerCentral")
 
+SELLER_CENTRAL_URL = os.getenv("SELLER_CENTRAL_URL", "https://sellercentral-europe.amazon.com")
+
+PRODUCT_TTL = 7 * 24 * 3600
+
 
 class SellerCentral:
-    def __init__(self, asin: str, cookie: str):
-        self.asin = asin
+    """
+    Seller Central revenue calculator client, shared by every product of a scan.
+
+    One instance per marketplace; each is rate limited separately. Product
+    metadata (title, link, gl, image) is cached per ASIN on disk, and
+    concurrent lookups of the same ASIN share one in-flight request.
+    """
+
+    def __init__(self, cookie: str, cache: Optional[DiskCache] = None, country_code: str = DEFAULT_MARKETPLACE):
         self.cookie = cookie
-        self.country_code = "FR"
+        self.cache = cache
+        self.country_code = country_code
         self.locale = "en-GB"
+        self._inflight = {}
+
+    def cache_key(self, asin: str) -> str:
+        # Keys of the default marketplace stay bare ASINs, as before.
+        return asin if self.country_code == DEFAULT_MARKETPLACE else f"{self.country_code}:{asin}"
+
+    @metrics.timed("seller_central.get_product_data")
+    async def get_product_data(self, asin: str):
+        key = self.cache_key(asin)
+        if self.cache:
+            found, product = self.cache.get(key)
+            if found:
+                return tuple(product)
 
-    async def get_product_data(self):
-        url = f"https://sellercentral-europe.amazon.com/rcpublic/productmatch?searchKey={self.asin}&countryCode={self.country_code}&locale={self.locale}"
+        task = self._inflight.get(asin)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_product_data(asin))
+            self._inflight[asin] = task
+            task.add_done_callback(lambda _: self._inflight.pop(asin, None))
+
+        product = await asyncio.shield(task)
+
+        if product and self.cache:
+            self.cache.set(key, list(product), PRODUCT_TTL)
+
+        return product
+
+    async def _fetch_product_data(self, asin: str):
+        url = f"{SELLER_CENTRAL_URL}/rcpublic/productmatch?searchKey={asin}&countryCode={self.country_code}&locale={self.locale}"
         try:
             async with Requester(
                 url=url,
-                referrer="https://sellercentral-europe.amazon.com/revcalpublic?mons_sel_locale=en_GB",
+                referrer=f"{SELLER_CENTRAL_URL}/revcalpublic?mons_sel_locale=en_GB",
                 cookie=self.cookie,
-                api=True
+                api=True,
+                bucket=self.country_code,
             ) as scraper:
                 output = await scraper.fetch_get()
                 
             if not output or not hasattr(output, 'text'):
-                logger.error(f"No response for product data of ASIN {self.asin}")
+                logger.error(f"No response for product data of ASIN {asin}")
                 return None
 
             data = json.loads(output.text)
             product = data.get("data", {}).get("otherProducts", {}).get("products", [])
             if not product:
-                logger.warning(f"No product found for ASIN {self.asin}")
+                logger.warning(f"No product found for ASIN {asin}")
                 return None
 
             product = product[0]
             return product.get("title"), product.get("link"), product.get("gl"), product.get("imageUrl")
 
         except json.JSONDecodeError:
-            logger.exception(f"Failed to parse JSON for product data of ASIN {self.asin}: {output.text if output else 'No output'}")
+            logger.exception(f"Failed to parse JSON for product data of ASIN {asin}: {output.text if output else 'No output'}")
         except Exception:
-            logger.exception(f"Unexpected error fetching product data for ASIN {self.asin}")
+            logger.exception(f"Unexpected error fetching product data for ASIN {asin}")
         return None
 
-    async def get_price(self):
-        url = f"https://sellercentral-europe.amazon.com/rcpublic/getadditionalpronductinfo?countryCode={self.country_code}&asin={self.asin}&fnsku=&searchType=GENERAL&locale={self.locale}"
+    @metrics.timed("seller_central.get_price")
+    async def get_price(self, asin: str):
+        url = f"{SELLER_CENTRAL_URL}/rcpublic/getadditionalpronductinfo?countryCode={self.country_code}&asin={asin}&fnsku=&searchType=GENERAL&locale={self.locale}"
         try:
             async with Requester(
                 url=url,
-                referrer="https://sellercentral-europe.amazon.com/revcalpublic?mons_sel_locale=en_GB",
+                referrer=f"{SELLER_CENTRAL_URL}/revcalpublic?mons_sel_locale=en_GB",
                 cookie=self.cookie,
-                api=True
+                api=True,
+                bucket=self.country_code,
             ) as scraper:
                 output = await scraper.fetch_get()
 
             if not output or not hasattr(output, 'text'):
-                logger.error(f"No response for price data of ASIN {self.asin}")
+                logger.error(f"No response for price data of ASIN {asin}")
                 return None
 
             data = json.loads(output.text)
             price_data = data.get("data", {})
             if not price_data:
-                logger.info(f"Price data empty for ASIN {self.asin}, returning default 1")
+                logger.info(f"Price data empty for ASIN {asin}, returning default 1")
                 return 1.0
 
             return float(price_data.get("price", {}).get("amount", 0.0))
 
         except json.JSONDecodeError:
-            logger.exception(f"Failed to parse JSON for price of ASIN {self.asin}: {output.text if output else 'No output'}")
+            logger.exception(f"Failed to parse JSON for price of ASIN {asin}: {output.text if output else 'No output'}")
         except Exception:
-            logger.exception(f"Unexpected error fetching price for ASIN {self.asin}")
+            logger.exception(f"Unexpected error fetching price for ASIN {asin}")
         return None
 
-    async def get_fees(self, gl: str, price: float):
-        url = f"https://sellercentral-europe.amazon.com/rcpublic/getfees?countryCode={self.country_code}&locale={self.locale}"
+    async def get_fees(self, asin: str, gl: str, price: float):
+        breakdown = await self.get_fee_breakdown(asin, gl, price)
+        if breakdown is None:
+            return None
+        return round(sum(breakdown.values()), 2)
+
+    @metrics.timed("seller_central.get_fees")
+    async def get_fee_breakdown(self, asin: str, gl: str, price: float):
+        url = f"{SELLER_CENTRAL_URL}/rcpublic/getfees?countryCode={self.country_code}&locale={self.locale}"
         peak = datetime.now().month in [10, 11, 12]
 
         payload = {
             "countryCode": self.country_code,
             "itemInfo": {
-                "asin": self.asin,
+                "asin": asin,
                 "glProductGroupName": gl,
                 "packageLength": "0",
                 "packageWidth": "0",
@@ -102,38 +156,40 @@ class SellerCentral:
         try:
             async with Requester(
                 url=url,
-                referrer="https://sellercentral-europe.amazon.com/revcalpublic?mons_sel_locale=en_GB",
+                referrer=f"{SELLER_CENTRAL_URL}/revcalpublic?mons_sel_locale=en_GB",
                 cookie=self.cookie,
-                api=True
+                api=True,
+                bucket=self.country_code,
             ) as scraper:
                 output = await scraper.fetch_post(payload)
 
             if not output or not hasattr(output, 'text'):
-                logger.error(f"No response for fees of ASIN {self.asin}")
+                logger.error(f"No response for fees of ASIN {asin}")
                 return None
 
             data = json.loads(output.text)
             core = data.get("data", {}).get("programFeeResultMap", {}).get("Core#0", {})
 
             if not core:
-                logger.warning(f"No Core fee data for ASIN {self.asin}")
+                logger.warning(f"No Core fee data for ASIN {asin}")
                 return None
 
-            storage_fee = float(core.get("perUnitPeakStorageFee", {}).get("total", {}).get("amount", 0.0 if peak else 0.0))
-            fulfillment_fees = float(core.get("otherFeeInfoMap", {}).get("FulfillmentFee", {}).get("total", {}).get("amount", 0.0))
-            fixed_fee = float(core.get("otherFeeInfoMap", {}).get("FixedClosingFee", {}).get("total", {}).get("amount", 0.0))
-            referral_fee = float(core.get("otherFeeInfoMap", {}).get("ReferralFee", {}).get("total", {}).get("amount", 0.0))
-            variable_fee = float(core.get("otherFeeInfoMap", {}).get("VariableClosingFee", {}).get("total", {}).get("amount", 0.0))
-            digital_services_fee = float(core.get("otherFeeInfoMap", {}).get("DigitalServicesFee", {}).get("total", {}).get("amount", 0.0))
-
-            total_cost = storage_fee + fulfillment_fees + fixed_fee + referral_fee + variable_fee + digital_services_fee
-            return round(total_cost, 2)
+            fee_map = core.get("otherFeeInfoMap", {})
+            return {
+                "storage": float(core.get("perUnitPeakStorageFee", {}).get("total", {}).get("amount", 0.0 if peak else 0.0)),
+                "fulfillment": float(fee_map.get("FulfillmentFee", {}).get("total", {}).get("amount", 0.0)),
+                "fixed_closing": float(fee_map.get("FixedClosingFee", {}).get("total", {}).get("amount", 0.0)),
+                "referral": float(fee_map.get("ReferralFee", {}).get("total", {}).get("amount", 0.0)),
+                "variable_closing": float(fee_map.get("VariableClosingFee", {}).get("total", {}).get("amount", 0.0)),
+                "digital_services": float(fee_map.get("DigitalServicesFee", {}).get("total", {}).get("amount", 0.0)),
+            }
 
         except json.JSONDecodeError:
-            logger.exception(f"Failed to parse JSON for fees of ASIN {self.asin}: {output.text if output else 'No output'}")
+            logger.exception(f"Failed to parse JSON for fees of ASIN {asin}: {output.text if output else 'No output'}")
         except Exception:
-            logger.exception(f"Unexpected error fetching fees for ASIN {self.asin}")
+            logger.exception(f"Unexpected error fetching fees for ASIN {asin}")
         return None
 
-    def sas_link_gen(self):
-        return f"https://sas.selleramp.com/sas/lookup?SasLookup%5Bsearch_term%5D={self.asin}"
+    @staticmethod
+    def sas_link_gen(asin: str):
+        return f"https://sas.selleramp.com/sas/lookup?SasLookup%5Bsearch_term%5D={asin}"
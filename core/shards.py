@@ -0,0 +1,113 @@
+# core/shards.py
+
+import os
+import re
+import sys
+import glob
+import zlib
+import asyncio
+from .logger import get_logger
+from .storage import read_deals
+from .ratelimit import RATE_LIMIT_SHARE
+
+logger = get_logger("Shards")
+
+SHARD_DIR = "data/shards"
+# Per-shard deal files only, not their index or posted-log sidecars.
+SHARD_FILE = re.compile(r"deals\.\d+-of-\d+\.json")
+
+
+def parse_shard(value: str) -> tuple:
+    """
+    Parses an `i/N` shard spec into `(i, N)`, with 0 <= i < N.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N.")
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{value}', expected 0 <= i < N.")
+    return index, count
+
+
+def in_shard(ean: str, shard: tuple) -> bool:
+    index, count = shard
+    return zlib.crc32(str(ean).encode()) % count == index
+
+
+def shard_path(shard: tuple) -> str:
+    index, count = shard
+    return os.path.join(SHARD_DIR, f"deals.{index}-of-{count}.json")
+
+
+def shard_files(directory: str = SHARD_DIR) -> list:
+    """
+    Returns the per-shard deal files in `directory`, in shard order.
+    """
+    paths = glob.glob(os.path.join(directory, "deals.*.json"))
+    return sorted(path for path in paths if SHARD_FILE.fullmatch(os.path.basename(path)))
+
+
+def journal_path(shard: tuple, base: str) -> str:
+    index, count = shard
+    root, ext = os.path.splitext(base)
+    return f"{root}.{index}-of-{count}{ext}"
+
+
+async def run_shards(count: int, args: list) -> bool:
+    """
+    Runs `count` scanner processes, one per shard, each with its own event
+    loop and browser, splitting the per-host rate limits between them.
+    Returns True if all of them exited cleanly.
+    """
+    env = {**os.environ, "RATE_LIMIT_SHARE": str(count * RATE_LIMIT_SHARE)}
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, sys.argv[0], "--shard", f"{index}/{count}", *args, env=env
+        )
+        for index in range(count)
+    ]
+    codes = await asyncio.gather(*(process.wait() for process in processes))
+
+    for index, code in enumerate(codes):
+        if code != 0:
+            logger.error(f"Shard {index}/{count} exited with code {code}.")
+    return all(code == 0 for code in codes)
+
+
+def load_shards(directory: str = SHARD_DIR) -> list:
+    """
+    Reads every per-shard deal file in `directory`. Raises ValueError if
+    there are none or any of them is unreadable or holds a malformed deal.
+    """
+    paths = shard_files(directory)
+    if not paths:
+        raise ValueError(f"No shard files in {directory}.")
+
+    deals = []
+    for path in paths:
+        try:
+            deals.extend(read_deals(path))
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            raise ValueError(f"Invalid shard file {path}: {str(e) or type(e).__name__}") from e
+    return deals
+
+
+async def merge_shards(db, directory: str = SHARD_DIR) -> int:
+    """
+    Replaces the contents of `db` with every per-shard deal, skipping
+    duplicate ASINs/EANs. All shard files are read and checked before
+    `db` is reset, so a bad file leaves it untouched.
+    Returns the number of deals merged.
+    """
+    deals = load_shards(directory)
+    await db.reset_db()
+
+    merged = 0
+    for deal in deals:
+        if await db.save_deal(deal.to_dict()):
+            merged += 1
+
+    logger.info(f"Merged {merged} deals from shard files.")
+    return merged
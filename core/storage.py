@@ -0,0 +1,492 @@
+# core/storage.py
+
+import os
+import copy
+import json
+import time
+import heapq
+import sqlite3
+import tempfile
+from .deal import SCHEMA_VERSION, Deal
+from .logger import get_logger
+
+logger = get_logger("Storage")
+
+JSON_PATH = "data/deals.json"
+JSONL_PATH = "data/deals.jsonl"
+SQLITE_PATH = "data/deals.db"
+
+# DB_FORMAT=jsonl switches the committed deal file to the compact format.
+DEALS_PATH = JSONL_PATH if os.getenv("DB_FORMAT", "json") == "jsonl" else JSON_PATH
+
+
+class SchemaError(Exception):
+    """
+    Raised for deal files written by a newer schema version. Never treated as
+    corruption, so an old checkout cannot wipe them.
+    """
+
+
+def atomic_write_text(path: str, text: str):
+    """
+    Writes to a temp file in the target directory and renames it over
+    `path`, so readers never see a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+
+    try:
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Sidecars are named after the full deal file name, so deals.json and
+# deals.jsonl never share them.
+def index_path(path: str) -> str:
+    return path + ".index.json"
+
+
+def posted_path(path: str) -> str:
+    return path + ".posted.jsonl"
+
+
+def append_posted(path: str, asins: list, posted_at: str):
+    """
+    Records deals of `path` as posted in its append-only posted log, without
+    touching the deal file itself. The log is folded into the deals the next
+    time a storage opens them (see apply_posted).
+    """
+    with open(posted_path(path), "a", encoding="utf-8") as f:
+        for asin in asins:
+            f.write(json.dumps({"asin": asin, "posted_at": posted_at}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_posted(path: str) -> dict:
+    """
+    Returns the posted log of `path` as {asin: posted_at}. A torn last line
+    (crash mid-append) is ignored.
+    """
+    posted = {}
+    try:
+        with open(posted_path(path), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                posted[record["asin"]] = record["posted_at"]
+    except FileNotFoundError:
+        pass
+    return posted
+
+
+def apply_posted(storage, path: str):
+    """
+    Folds the posted log of `path` into the storage opened on it, writes the
+    deal file and only then drops the log.
+    """
+    # Posted logs used to be named without the deal file's extension.
+    legacy = os.path.splitext(path)[0] + ".posted.jsonl"
+    if os.path.exists(legacy) and not os.path.exists(posted_path(path)):
+        os.replace(legacy, posted_path(path))
+
+    posted = read_posted(path)
+    if not posted:
+        return
+
+    by_time = {}
+    for asin, posted_at in posted.items():
+        by_time.setdefault(posted_at, []).append(asin)
+    for posted_at, asins in by_time.items():
+        storage.mark_posted(asins, posted_at)
+
+    storage.flush()
+    os.remove(posted_path(path))
+    logger.info(f"Applied {len(posted)} posted deal(s) from {posted_path(path)}.")
+
+
+def write_deals(path: str, deals: list):
+    """
+    Writes deals, plus a small sidecar index with the total count and the
+    byte range of every unposted deal, so readers can pick the next deals to
+    post without parsing the whole file.
+
+    `.jsonl` paths get the compact format: a schema header line, then one
+    short-keyed record per line. Anything else gets the historical indented
+    JSON array.
+    """
+    compact = path.endswith(".jsonl")
+    parts = []
+    unposted = []
+
+    if compact:
+        offset = 0
+        parts.append(json.dumps({"schema": "deal", "v": SCHEMA_VERSION}))
+        offset += len(parts[0]) + 1
+
+        for deal in deals:
+            text = json.dumps(deal.to_compact(), separators=(",", ":"))
+            if not deal.posted:
+                unposted.append([deal.created_at, deal.asin, offset, len(text)])
+            parts.append(text)
+            offset += len(text) + 1
+
+        text = "\n".join(parts) + "\n"
+    else:
+        offset = 2
+
+        for deal in deals:
+            text = "  " + json.dumps(deal.to_dict(), indent=2).replace("\n", "\n  ")
+            if not deal.posted:
+                unposted.append([deal.created_at, deal.asin, offset + 2, len(text) - 2])
+            parts.append(text)
+            offset += len(text) + 2
+
+        text = "[\n" + ",\n".join(parts) + "\n]" if parts else "[]"
+
+    atomic_write_text(path, text)
+
+    index = {
+        "format": "jsonl" if compact else "json",
+        "size": len(text.encode("utf-8")),
+        "total": len(deals),
+        "unposted": unposted,
+    }
+    atomic_write_text(index_path(path), json.dumps(index))
+
+
+def read_deals(path: str) -> list:
+    """
+    Reads every deal from a JSON array or compact JSON Lines file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".jsonl"):
+            return [Deal.from_dict(deal) for deal in json.load(f)]
+
+        header = json.loads(f.readline() or "{}")
+        if header.get("schema") != "deal" or header.get("v", 0) > SCHEMA_VERSION:
+            raise SchemaError(f"Unsupported deal file schema: {header}")
+
+        return [Deal.from_compact(json.loads(line)) for line in f if line.strip()]
+
+
+def read_index(path: str = DEALS_PATH):
+    """
+    Returns the sidecar index of `path`, or None if it is missing or does not
+    match the current file.
+    """
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index["size"] != os.path.getsize(path):
+            return None
+        return index
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def read_unposted(path: str, index: dict, limit: int):
+    """
+    Loads the `limit` oldest unposted deals through the sidecar index, reading
+    only their byte ranges and skipping those in the posted log. Returns None
+    if the index turns out to be stale.
+    """
+    posted = read_posted(path)
+    unposted = (entry for entry in index["unposted"] if entry[1] not in posted)
+    entries = heapq.nsmallest(limit, unposted, key=lambda entry: entry[0])
+    compact = index.get("format") == "jsonl"
+    deals = []
+
+    with open(path, "rb") as f:
+        for _, asin, start, length in entries:
+            f.seek(start)
+            try:
+                data = json.loads(f.read(length))
+                deal = Deal.from_compact(data) if compact else Deal.from_dict(data)
+            except (ValueError, TypeError):
+                return None
+            if deal.asin != asin:
+                return None
+            deals.append(deal.to_dict())
+
+    return deals
+
+
+class JsonStorage:
+    """
+    In-memory deal store backed by a JSON array (or compact JSON Lines) file.
+
+    The file is read once on open. Mutations are applied to a dict of `Deal`
+    records keyed by ASIN (plus an EAN set for dedup) and written behind in
+    batches, once `flush_every` mutations are pending or `flush_interval`
+    seconds have passed, and always on close.
+    """
+
+    def __init__(self, path: str = DEALS_PATH, flush_every: int = 50, flush_interval: float = 30.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self.deals = {}
+        self.eans = set()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def open(self):
+        try:
+            deals = read_deals(self.path)
+        except FileNotFoundError:
+            deals = []
+            self.pending += 1
+        except (ValueError, TypeError, KeyError):
+            logger.error("Database missing or corrupted. Resetting.")
+            deals = []
+            self.pending += 1
+
+        for deal in deals:
+            self.deals[deal.asin] = deal
+            self.eans.add(deal.ean)
+
+        if self.pending:
+            self.flush()
+        apply_posted(self, self.path)
+
+    def close(self):
+        if self.pending:
+            self.flush()
+
+    def flush(self):
+        write_deals(self.path, list(self.deals.values()))
+        logger.info(f"Flushed {self.pending} pending changes to {self.path}.")
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def _touch(self):
+        self.pending += 1
+        if self.pending >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def insert(self, deal: Deal) -> bool:
+        if deal.asin in self.deals or deal.ean in self.eans:
+            return False
+
+        self.deals[deal.asin] = deal
+        self.eans.add(deal.ean)
+        self._touch()
+        return True
+
+    def count(self) -> int:
+        return len(self.deals)
+
+    def unposted(self, limit: int) -> list:
+        # Copies, so callers cannot change the stored deals behind the flush bookkeeping.
+        unposted = (d for d in self.deals.values() if not d.posted)
+        return [copy.copy(d) for d in heapq.nsmallest(limit, unposted, key=lambda d: d.created_at)]
+
+    def mark_posted(self, asins: list, posted_at: str) -> int:
+        marked = 0
+        for asin in asins:
+            deal = self.deals.get(asin)
+            if deal is None:
+                continue
+
+            deal.posted = True
+            deal.posted_at = posted_at
+            marked += 1
+
+        if marked:
+            self._touch()
+        return marked
+
+    def reset(self):
+        self.deals.clear()
+        self.eans.clear()
+        self._touch()
+
+
+class SQLiteStorage:
+    """
+    SQLite (WAL) storage with unique ASIN/EAN indexes.
+
+    The committed deal file (`deals.json`, or `deals.jsonl`) stays the source
+    of truth: it is imported on open whenever it changed since the last
+    export, and exported again on close. Rows keep the compact record
+    without the state columns or derived links.
+
+    Like JsonStorage, inserts are written behind: they share one transaction
+    that is committed once `flush_every` of them are pending or
+    `flush_interval` seconds have passed, and always on flush or close.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS deals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            asin TEXT NOT NULL,
+            ean TEXT NOT NULL,
+            posted INTEGER NOT NULL DEFAULT 0,
+            posted_at TEXT,
+            created_at TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_deals_asin ON deals(asin);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_deals_ean ON deals(ean);
+        CREATE INDEX IF NOT EXISTS idx_deals_posted_created ON deals(posted, created_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: str = SQLITE_PATH, json_path: str = DEALS_PATH, flush_every: int = 50, flush_interval: float = 30.0):
+        self.path = path
+        self.json_path = json_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.conn = None
+
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def open(self):
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        if self._json_signature() != self._get_meta("json_signature"):
+            self.import_json()
+        apply_posted(self, self.json_path)
+
+    def close(self):
+        if not self.conn:
+            return
+        self.commit()
+        self.export_json()
+        self.conn.close()
+        self.conn = None
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def _touch(self):
+        self.pending += 1
+        if self.pending >= self.flush_every or time.monotonic() - self.last_commit >= self.flush_interval:
+            self.commit()
+
+    def _json_signature(self):
+        try:
+            stat = os.stat(self.json_path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _get_meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @staticmethod
+    def _row(deal: Deal) -> tuple:
+        data = deal.to_compact()
+        for key in ("po", "pa", "ca"):
+            del data[key]
+        return (
+            deal.asin,
+            deal.ean,
+            int(deal.posted),
+            deal.posted_at,
+            deal.created_at,
+            json.dumps(data, separators=(",", ":")),
+        )
+
+    @staticmethod
+    def _deal(row) -> Deal:
+        deal = Deal.from_compact(json.loads(row[0]))
+        deal.posted = bool(row[1])
+        deal.posted_at = row[2]
+        deal.created_at = row[3]
+        return deal
+
+    def import_json(self):
+        try:
+            deals = read_deals(self.json_path)
+        except FileNotFoundError:
+            deals = []
+        except (ValueError, TypeError, KeyError):
+            logger.error(f"{self.json_path} corrupted. Importing nothing.")
+            deals = []
+
+        with self.conn:
+            self.conn.execute("DELETE FROM deals")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO deals (asin, ean, posted, posted_at, created_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._row(d) for d in deals),
+            )
+            self._set_meta("json_signature", self._json_signature())
+
+        logger.info(f"Imported {len(deals)} deals from {self.json_path}.")
+
+    def export_json(self):
+        rows = self.conn.execute(
+            "SELECT data, posted, posted_at, created_at FROM deals ORDER BY id"
+        )
+        deals = [self._deal(row) for row in rows]
+
+        write_deals(self.json_path, deals)
+
+        with self.conn:
+            self._set_meta("json_signature", self._json_signature())
+
+    def insert(self, deal: Deal) -> bool:
+        # Uncommitted rows are visible to this connection, so dedup stays exact.
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO deals (asin, ean, posted, posted_at, created_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+            self._row(deal),
+        )
+        if cursor.rowcount != 1:
+            return False
+        self._touch()
+        return True
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM deals").fetchone()[0]
+
+    def unposted(self, limit: int) -> list:
+        rows = self.conn.execute(
+            "SELECT data, posted, posted_at, created_at FROM deals WHERE posted = 0 ORDER BY created_at LIMIT ?",
+            (limit,),
+        )
+        return [self._deal(row) for row in rows]
+
+    def mark_posted(self, asins: list, posted_at: str) -> int:
+        with self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE deals SET posted = 1, posted_at = ? WHERE asin = ?",
+                ((posted_at, asin) for asin in asins),
+            )
+        return cursor.rowcount
+
+    def flush(self):
+        self.commit()
+        self.export_json()
+
+    def reset(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM deals")
@@ -1,63 +1,151 @@
 # poster.py
 
 import os
-import asyncio
+import math
 import random
-from core.database import Database
-from core.discord_sender import DiscordSender
+import asyncio
+from datetime import datetime, timezone
 from core.logger import get_logger
+from core.metrics import metrics
+from core.storage import DEALS_PATH, append_posted, read_index, read_unposted
 from dotenv import load_dotenv
-import json
-import math
 
 load_dotenv()
 
 logger = get_logger("Poster")
 
-WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK")
+# One or more comma-separated webhook URLs; deals are spread across them.
+WEBHOOK_URLS = [url.strip() for url in os.getenv("DISCORD_WEBHOOK", "").split(",") if url.strip()]
 
-with open("data/deals.json", "r", encoding="utf-8") as f:
-    total = len(json.loads(f.read()))
+# Deals per webhook message (Discord allows up to 10 embeds).
+POST_BATCH_SIZE = max(1, min(10, int(os.getenv("POST_BATCH_SIZE", "10"))))
+# Seconds between two posts on the same webhook.
+MIN_DELAY = float(os.getenv("POST_MIN_DELAY", "15"))
+MAX_DELAY = float(os.getenv("POST_MAX_DELAY", "30"))
 
-MAX_POSTS_PER_RUN = math.ceil(total/5) if total > 50 else total
-MIN_DELAY = 15
-MAX_DELAY = 30
 
-async def main():
-    if not WEBHOOK_URL:
-        logger.error("DISCORD_WEBHOOK not set.")
-        return
+def posts_per_run(total: int) -> int:
+    return math.ceil(total/5) if total > 50 else total
 
-    logger.info("Starting hourly poster run.")
 
-    db = Database()
-    sender = DiscordSender(WEBHOOK_URL)
+def schedule(count: int, lanes: int, start: float) -> list:
+    """
+    Computes a target post time for each of `count` messages. They are dealt
+    round-robin onto `lanes` webhooks, and each lane keeps the randomised
+    MIN_DELAY..MAX_DELAY spacing between its own posts.
+    """
+    next_at = [start] * lanes
+    targets = []
 
-    deals = await db.get_unposted_deals(limit=MAX_POSTS_PER_RUN)
+    for i in range(count):
+        lane = i % lanes
+        targets.append(next_at[lane])
+        next_at[lane] += random.uniform(MIN_DELAY, MAX_DELAY)
 
-    if not deals:
-        logger.info("No unposted deals found.")
-        return
+    return targets
 
-    logger.info(f"Posting {len(deals)} deals")
 
-    for deal in deals:
-        try:
-            success = await sender.send_deal(deal)
+async def post_at(target: float, sender, batch: list, record_posted):
+    loop = asyncio.get_running_loop()
+    delay = target - loop.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
 
-            if success:
-                await db.mark_as_posted(deal["asin"])
-                logger.info(f"Posted ASIN {deal['asin']}")
+    try:
+        results = await sender.send_deals(batch)
 
-        except Exception as e:
-            logger.exception(f"Failed ASIN {deal.get('asin')} - {e}")
+        posted = [deal["asin"] for deal, success in zip(batch, results) if success]
+        if posted:
+            # Persist right after the post so a crash later in the run cannot repost these.
+            await record_posted(posted)
 
-        delay = random.uniform(MIN_DELAY, MAX_DELAY)
-        logger.info(f"Waiting {delay}s before posting next deal.")
-        await asyncio.sleep(delay)
+    except Exception as e:
+        logger.exception(f"Failed ASINs {[deal.get('asin') for deal in batch]} - {e}")
+
+
+def next_deals_from_index():
+    """
+    Picks this run's deals through the sidecar index, without parsing the
+    database. Returns None when the index is missing or stale.
+    """
+    index = read_index(DEALS_PATH)
+    if index is None:
+        return None
+    return read_unposted(DEALS_PATH, index, posts_per_run(index["total"]))
+
+
+async def post():
+    if not WEBHOOK_URLS:
+        logger.error("DISCORD_WEBHOOK not set.")
+        return
+
+    logger.info("Starting hourly poster run.")
+
+    deals = next_deals_from_index()
+    if deals is not None and not deals:
+        logger.info("No unposted deals found.")
+        return
+
+    import aiohttp
+    from core.database import Database
+    from core.discord_sender import DiscordSender
+
+    db = None
+    if deals is None:
+        logger.info("Deal index missing or stale, reading the full database.")
+        db = Database()
+
+        async def record_posted(asins):
+            await db.mark_as_posted_many(asins)
+            await db.flush()
+    else:
+        # Posted state goes to the append-only posted log, so the deal file
+        # is never loaded; the next full open of the database folds it in.
+        async def record_posted(asins):
+            append_posted(DEALS_PATH, asins, datetime.now(timezone.utc).isoformat())
+            logger.info(f"Marked {len(asins)} ASIN(s) as posted: {', '.join(asins)}.")
+
+    session = aiohttp.ClientSession()
+    senders = [DiscordSender(url, session) for url in WEBHOOK_URLS]
+
+    try:
+        if db is not None:
+            deals = await db.get_unposted_deals(limit=posts_per_run(await db.count()))
+
+        if not deals:
+            logger.info("No unposted deals found.")
+            return
+
+        batches = [
+            batch
+            for start in range(0, len(deals), POST_BATCH_SIZE)
+            for batch in DiscordSender.pack(deals[start:start + POST_BATCH_SIZE])
+        ]
+        targets = schedule(len(batches), len(senders), asyncio.get_running_loop().time())
+        logger.info(
+            f"Posting {len(deals)} deals in {len(batches)} messages over {max(targets) - targets[0]:.0f}s "
+            f"across {len(senders)} webhook(s)"
+        )
+
+        await asyncio.gather(*(
+            post_at(target, senders[i % len(senders)], batch, record_posted)
+            for i, (target, batch) in enumerate(zip(targets, batches))
+        ))
+    finally:
+        await session.close()
+        if db is not None:
+            await db.close()
 
     logger.info("Finished hourly run")
 
 
+async def main():
+    try:
+        await post()
+    finally:
+        # Also for runs that return early, e.g. with nothing to post.
+        metrics.write_report("poster")
+
+
 if __name__ == "__main__":
     asyncio.run(main())
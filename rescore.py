@@ -0,0 +1,121 @@
+# rescore.py
+#
+# Re-scores every product the scanner has evaluated, from the inputs it
+# recorded in data/cache/inputs.db, with other thresholds or cost
+# assumptions, without any network calls.
+#
+#   python rescore.py [--min-roi 20] [--min-sales 3] [--vat-rate 1.2] \
+#       [--fee-scale 1.05] [--fulfillment-delta 0.2] [--dst-rates FR=0.03] \
+#       [--missing-fulfillment 3.5] [--marketplaces FR,DE] [--max-age 2] [--dry-run]
+
+import asyncio
+import argparse
+from collections import Counter
+from core.database import Database
+from core.inputs import INPUTS_PATH, InputStore
+from core.logger import get_logger
+from core.marketplaces import parse_marketplaces
+from core.metrics import metrics
+from core.scoring import MIN_PROFIT, MIN_ROI, MIN_SALES, VAT_RATE, build_deals, score, select
+
+logger = get_logger("Rescore")
+
+
+def parse_rates(value: str) -> dict:
+    """
+    Parses per-marketplace rates such as `FR=0.03,DE=0`.
+    """
+    rates = {}
+    for part in filter(None, (part.strip() for part in value.split(","))):
+        code, _, rate = part.partition("=")
+        try:
+            rates[parse_marketplaces(code)[0]] = float(rate)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid rate '{part}', expected e.g. FR=0.03.")
+    return rates
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline deal re-scoring")
+    parser.add_argument("--inputs", default=INPUTS_PATH, help="Inputs recorded by the scanner.")
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        help="Only re-score products seen in the feed within this many days.",
+    )
+    parser.add_argument("--vat-rate", type=float, default=VAT_RATE, help="Multiplier from supplier price to cost.")
+    parser.add_argument("--min-roi", type=float, default=MIN_ROI, help="Minimum ROI in percent.")
+    parser.add_argument("--min-profit", type=float, default=MIN_PROFIT, help="Minimum profit in EUR.")
+    parser.add_argument("--min-sales", type=float, default=MIN_SALES, help="Minimum estimated monthly sales.")
+    parser.add_argument(
+        "--marketplaces",
+        type=parse_marketplaces,
+        help="Only consider these marketplaces (default: every recorded one).",
+    )
+    parser.add_argument("--fee-scale", type=float, default=1.0, help="Multiply total fees by this factor.")
+    parser.add_argument("--fulfillment-delta", type=float, default=0.0, help="Add this to every fulfillment fee.")
+    parser.add_argument(
+        "--dst-rates",
+        type=parse_rates,
+        default={},
+        help="Digital services tax overrides per marketplace, e.g. FR=0.03,DE=0.",
+    )
+    parser.add_argument(
+        "--missing-fulfillment",
+        type=float,
+        help="Fulfillment fee to assume for products whose fees were never fetched.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be accepted; leave the database alone.",
+    )
+    return parser.parse_args()
+
+
+async def main(args):
+    store = InputStore(args.inputs)
+    try:
+        with metrics.timer("rescore.load"):
+            columns = store.load(max_age=args.max_age * 24 * 3600 if args.max_age is not None else None)
+    finally:
+        store.close()
+
+    with metrics.timer("rescore.score"):
+        scores = score(
+            columns,
+            vat_rate=args.vat_rate,
+            fee_scale=args.fee_scale,
+            fulfillment_delta=args.fulfillment_delta,
+            digital_services_rates=args.dst_rates,
+            missing_fulfillment=args.missing_fulfillment,
+        )
+        rows, stats = select(
+            columns, scores,
+            min_roi=args.min_roi,
+            min_profit=args.min_profit,
+            min_sales=args.min_sales,
+            marketplaces=args.marketplaces,
+        )
+        deals = build_deals(columns, scores, rows)
+
+    by_marketplace = Counter(deal["marketplace"] for deal in deals)
+    logger.info(f"Re-scored {stats['rows']} rows ({stats['products']} products): {stats}.")
+    logger.info(f"Accepted {len(deals)} deals: {dict(by_marketplace)}.")
+
+    if not args.dry_run:
+        # Same as a scan: the database is replaced by the new deal set.
+        db = Database()
+        await db.reset_db()
+        try:
+            for deal in deals:
+                await db.save_deal(deal)
+        finally:
+            await db.close()
+        logger.info(f"Saved {len(deals)} deals.")
+
+    metrics.write_report("rescore", selection=stats, marketplaces=dict(by_marketplace), dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
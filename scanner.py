@@ -1,154 +1,579 @@
 # scanner.py
 
+import os
+import time
 import asyncio
+import argparse
+from contextlib import aclosing
+from typing import Optional
 import aiohttp
+from core.cache import DiskCache
 from core.database import Database
 from core.ean2asin import convert
+from core.feed import JsonArrayParser, iter_json_array
+from core.fees import FeeModel
+from core.fetch_cache import FetchCache, read_chunks
+from core.fingerprints import FingerprintStore
+from core.inputs import InputStore
+from core.journal import JOURNAL_PATH, ScanJournal
 from core.logger import get_logger
+from core.marketplaces import DEFAULT_MARKETPLACE, parse_marketplaces
+from core.metrics import metrics
+from core.pipeline import Pipeline
+from core.scoring import MIN_PROFIT, MIN_ROI, MIN_SALES, VAT_RATE
 from core.seller_central import SellerCentral
 from core.sales_scraper import SalesScraper
-from core.requester import Requester
+from core.parsers import close_parsers
+from core.requester import close_sessions
+from core.shards import in_shard, journal_path, merge_shards, parse_shard, run_shards, shard_files, shard_path
+from core.ratelimit import limiter
 import json
 
-JSON_URL = "https://raw.githubusercontent.com/dronx07/qogita_best_selling/main/products.json"
-COOKIE_URL = "https://raw.githubusercontent.com/dronx07/cookie_refresh/main/cookies.json"
+JSON_URL = os.getenv("PRODUCTS_URL", "https://raw.githubusercontent.com/dronx07/qogita_best_selling/main/products.json")
+COOKIE_URL = os.getenv("COOKIE_URL", "https://raw.githubusercontent.com/dronx07/cookie_refresh/main/cookies.json")
+
+ACCEPTED = "accepted"
+# Verdicts that only depend on the product itself and can be carried forward;
+# failed lookups and duplicates are always re-evaluated.
+FINAL_VERDICTS = ("roi_bound", "roi", "sales", ACCEPTED)
+
+WORKERS = 100
+FEED_CHUNK_SIZE = 64 * 1024
+FEED_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
 
 logger = get_logger("Scanner")
 
-async def fetch_products() -> list:
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(JSON_URL, timeout=10) as response:
-                    if response.status != 200:
-                        return []
-                    text = await response.text()
-                    data = json.loads(text)
-                    logger.info(f"Fetched products JSON.")
-                    return data
-        except Exception as e:
-            logger.error(f"Failed to fetch products JSON: {e}.")
-        return []
-
-
-async def fetch_cookies() -> tuple:
+def load_cookies(path: Optional[str]) -> tuple:
+    """
+    Returns the (amazon, seller, sas) cookies of a cookie bundle file.
+    """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(COOKIE_URL, timeout=10) as response:
-                if response.status != 200:
-                    return None,None,None
-                text = await response.text()
-                data = json.loads(text)
-                logger.info(f"Fetched cookies JSON.")
-                return data["set1"]["amazon"], data["set1"]["seller"], data["sas"]
-    except Exception as e:
-        logger.error(f"Failed to fetch cookies JSON: {e}.")
-    return None,None,None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data["set1"]["amazon"], data["set1"]["seller"], data["sas"]
+    except (TypeError, OSError, ValueError, KeyError) as e:
+        logger.error(f"Failed to load cookies JSON: {e}.")
+    return None, None, None
 
-async def process_product(product, semaphore, amazon_cookie, seller_cookie, db, sales_scraper):
-    async with semaphore:
-        try:
-            ean = product["product_gtin"]
-            supplier_price = float(product["supplier_price"])
-            supplier_cost = supplier_price * 1.20
-            supplier_link = product["product_link"]
-
-            asin = await convert(ean, amazon_cookie)
-            logger.info(f"{ean, asin}")
-
-            if not asin:
-                logger.warning(
-                    f"EAN {ean} skipped: No valid ASIN."
-                )
-                return
 
-            sc = SellerCentral(asin, seller_cookie)
+def valid_cookies(path: str) -> bool:
+    return load_cookies(path)[0] is not None
 
-            product_data = await sc.get_product_data()
-            if not product_data:
-                logger.warning(f"Failed to get product data for ASIN/EAN: {asin}/{ean}.")            
+
+def valid_feed(path: str) -> bool:
+    """
+    Whether `path` holds a complete top-level JSON array.
+    """
+    parser = JsonArrayParser()
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(FEED_CHUNK_SIZE):
+                parser.feed(chunk)
+        parser.close()
+        return True
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid products JSON: {e}.")
+        return False
+
+
+async def fetch_cookies(fetch_cache: FetchCache, session: aiohttp.ClientSession) -> tuple:
+    cookies_path = await fetch_cache.fetch(session, COOKIE_URL, "cookies.json", validate=valid_cookies)
+    return load_cookies(cookies_path)
+
+
+async def queue_products(queue: asyncio.Queue, chunks, shard: Optional[tuple], seen: set, skip: set = frozenset()) -> int:
+    count = 0
+    async with aclosing(chunks):
+        async for product in iter_json_array(chunks):
+            ean = product.get("product_gtin", "")
+            if (shard and not in_shard(ean, shard)) or ean in skip:
+                continue
+            seen.add(ean)
+            await queue.put(product)
+            count += 1
+    return count
+
+
+async def stream_products(
+    queue: asyncio.Queue,
+    fetch_cache: FetchCache,
+    session: aiohttp.ClientSession,
+    shard: Optional[tuple] = None,
+) -> tuple:
+    """
+    Streams the products feed into `queue` while it downloads, keeping only
+    the products of `shard` if given. If the download fails, even part-way,
+    the rest of the products come from the last good copy. Returns the number
+    of products queued and whether that was the whole feed.
+    """
+    seen = set()
+    count = 0
+    try:
+        count = await queue_products(
+            queue, fetch_cache.stream(session, JSON_URL, "products.json", validate=valid_feed), shard, seen,
+        )
+        logger.info(f"Read products JSON ({count} products).")
+        return count, True
+    except Exception as e:
+        error = e
+
+    path = fetch_cache.cached("products.json")
+    if not path:
+        logger.error(f"Failed to fetch products JSON: {str(error) or type(error).__name__}, and no cached copy to fall back on.")
+        return len(seen), False
+
+    logger.warning(
+        f"Failed to fetch products JSON after {len(seen)} products: {str(error) or type(error).__name__}. "
+        f"Continuing from the last good copy."
+    )
+    count = len(seen)
+    try:
+        count += await queue_products(queue, read_chunks(path, FEED_CHUNK_SIZE), shard, set(), skip=seen)
+        logger.info(f"Read products JSON ({count} products).")
+        return count, True
+    except Exception as e:
+        logger.error(f"Failed to read products JSON: {e}.")
+    return count, False
+
+
+class ScanContext:
+    def __init__(self, amazon_cookie, asin_cache, marketplaces, seller_centrals, fee_models, sales_scraper, db, fingerprints, journal, resumed, inputs):
+        self.amazon_cookie = amazon_cookie
+        self.asin_cache = asin_cache
+        self.marketplaces = marketplaces
+        self.seller_centrals = seller_centrals
+        self.fee_models = fee_models
+        self.sales_scraper = sales_scraper
+        self.db = db
+        self.fingerprints = fingerprints
+        self.journal = journal
+        self.resumed = resumed
+        self.inputs = inputs
+
+    def checkpoint(self, item, stage):
+        # The save stage is the last one; its outcome is recorded by finish().
+        if stage != "save":
+            self.journal.checkpoint(item, stage)
+
+    def record_inputs(self, item, supplier_price, verdict):
+        """
+        Stores what the evaluation learned about every priced marketplace,
+        so the product can be re-scored offline (see rescore.py).
+        """
+        rows = []
+        for marketplace, price in item.get("prices", {}).items():
+            learned = self.fee_models[marketplace].learned(item["asin"]) or {}
+            offer = item["offers"].get(marketplace, {})
+            rows.append({
+                "ean": item["ean"],
+                "marketplace": marketplace,
+                "asin": item["asin"],
+                "name": item["title"],
+                "gl": item["gl"],
+                "image_url": item["image_url"],
+                "supplier_link": item["supplier_link"],
+                "supplier_price": supplier_price,
+                "amazon_price": price,
+                "storage": learned.get("storage"),
+                "fulfillment": learned.get("fulfillment"),
+                "fixed_closing": learned.get("fixed_closing"),
+                "fees": offer.get("fees"),
+                "sales": item.get("sales"),
+                "verdict": verdict,
+            })
+        self.inputs.record(rows)
+
+
+async def resolve_asin(item, ctx):
+    asin = await convert(item["ean"], ctx.amazon_cookie, ctx.asin_cache)
+    logger.info(f"{item['ean'], asin}")
+
+    if not asin:
+        logger.warning(
+            f"EAN {item['ean']} skipped: No valid ASIN."
+        )
+        return False
+
+    item["asin"] = asin
+    return True
+
+
+async def fetch_listing(item, ctx):
+    asin, ean = item["asin"], item["ean"]
+    primary = ctx.marketplaces[0]
+
+    # Metadata comes from the primary marketplace; prices from all of them at once.
+    product_data, *prices = await asyncio.gather(
+        ctx.seller_centrals[primary].get_product_data(asin),
+        *(ctx.seller_centrals[marketplace].get_price(asin) for marketplace in ctx.marketplaces),
+    )
+    if not product_data:
+        logger.warning(f"Failed to get product data for ASIN/EAN: {asin}/{ean}.")
+        return False
+
+    item["title"], item["amazon_link"], item["gl"], item["image_url"] = product_data
+
+    item["prices"] = {
+        marketplace: price
+        for marketplace, price in zip(ctx.marketplaces, prices)
+        if price
+    }
+    item["offers"] = {marketplace: {"price": price} for marketplace, price in item["prices"].items()}
+    if not item["offers"]:
+        logger.warning(f"Failed to get price for ASIN/EAN: {asin}/{ean}.")
+        return False
+
+    return True
+
+
+async def bound_roi(item, ctx):
+    best_roi, best_profit = None, None
+
+    for marketplace, offer in list(item["offers"].items()):
+        price = offer["price"]
+        max_profit = price - ctx.fee_models[marketplace].fee_floor(item["gl"], price) - item["supplier_cost"]
+        max_roi = (max_profit / item["supplier_cost"]) * 100
+
+        if best_roi is None or max_roi > best_roi:
+            best_roi, best_profit = max_roi, max_profit
+        if max_roi < MIN_ROI or max_profit < MIN_PROFIT:
+            del item["offers"][marketplace]
+
+    if not item["offers"]:
+        logger.info(
+            f"ASIN {item['asin']} skipped: [max ROI {best_roi:.2f}%, max Profit {best_profit:.2f}]."
+        )
+        return False
+    return True
+
+
+async def fetch_fees(item, ctx):
+    marketplaces = list(item["offers"])
+    fees = await asyncio.gather(*(
+        ctx.fee_models[marketplace].get_fees(item["asin"], item["gl"], item["offers"][marketplace]["price"])
+        for marketplace in marketplaces
+    ))
+
+    for marketplace, marketplace_fees in zip(marketplaces, fees):
+        if marketplace_fees:
+            item["offers"][marketplace]["fees"] = marketplace_fees
+        else:
+            del item["offers"][marketplace]
+
+    if not item["offers"]:
+        logger.warning(f"Failed to get fees for ASIN/EAN: {item['asin']}/{item['ean']}.")
+        return False
+    return True
+
+
+async def check_roi(item, ctx):
+    for offer in item["offers"].values():
+        offer["profit"] = offer["price"] - offer["fees"] - item["supplier_cost"]
+        offer["roi"] = (offer["profit"] / item["supplier_cost"]) * 100
+
+    item["marketplace"], best = max(item["offers"].items(), key=lambda entry: entry[1]["roi"])
+    item["price"], item["fees"], item["profit"], item["roi"] = best["price"], best["fees"], best["profit"], best["roi"]
+
+    if item["roi"] < MIN_ROI or item["profit"] < MIN_PROFIT:
+        logger.info(
+            f"ASIN {item['asin']} skipped: [ROI {item['roi']:.2f}%, Profit {item['profit']:.2f}, best on {item['marketplace']}]."
+        )
+        return False
+    return True
+
+
+async def check_sales(item, ctx):
+    sales = await ctx.sales_scraper.get_sales(item["asin"])
+    item["sales"] = sales
+
+    if not sales or sales < MIN_SALES:
+        logger.info(f"ASIN {item['asin']} skipped: estimated sales = {sales}.")
+        return False
+    return True
+
+
+async def save(item, ctx):
+    deal = {
+        "ean": item["ean"],
+        "asin": item["asin"],
+        "marketplace": item["marketplace"],
+        "name": item["title"],
+        "supplier_cost": item["supplier_cost"],
+        "amazon_price": item["price"],
+        "fees": item["fees"],
+        "profit": item["profit"],
+        "roi": item["roi"],
+        "estimated_sales": item["sales"],
+        "amazon_link": item["amazon_link"],
+        "supplier_link": item["supplier_link"],
+        "sas_link": SellerCentral.sas_link_gen(item["asin"]),
+        "image_url": item["image_url"],
+    }
+
+    item["deal"] = dict(deal)
+    saved = await ctx.db.save_deal(deal)
+
+    if saved:
+        logger.info(
+            f"Queued ASIN {item['asin']} on {item['marketplace']} [Profit: €{item['profit']:.2f}, ROI: {item['roi']:.2f}%]."
+        )
+    return saved
+
+
+def build_pipeline() -> Pipeline:
+    return Pipeline([
+        ("asin", resolve_asin),
+        ("listing", fetch_listing),
+        ("roi_bound", bound_roi),
+        ("fees", fetch_fees),
+        ("roi", check_roi),
+        ("sales", check_sales),
+        ("save", save),
+    ])
+
+
+async def carry_forward(fingerprint, ctx):
+    deal = fingerprint.get("deal")
+    if fingerprint["verdict"] == ACCEPTED and deal:
+        if await ctx.db.save_deal(dict(deal)):
+            logger.info(f"Carried forward ASIN {deal['asin']} (unchanged since last scan).")
+
+
+async def replay_journal(resumed: dict, db):
+    """
+    Re-saves the deals accepted before the interrupted run stopped.
+    """
+    replayed = 0
+    for record in resumed.values():
+        if record.get("done") and record.get("verdict") == ACCEPTED and record.get("deal"):
+            if await db.save_deal(dict(record["deal"])):
+                replayed += 1
+    logger.info(f"Resuming: {len(resumed)} products in journal, {replayed} deals restored.")
+
+
+async def process_product(product, pipeline, ctx):
+    try:
+        ean = product["product_gtin"]
+        supplier_price = float(product["supplier_price"])
+        supplier_link = product["product_link"]
+        ctx.inputs.touch(ean, ctx.marketplaces)
+
+        record = ctx.resumed.get(ean)
+        if record and record.get("done"):
+            return
+
+        if record:
+            item, after = record["item"], record["stage"]
+        else:
+            fingerprint = ctx.fingerprints.lookup(ean, supplier_price, supplier_link)
+            if fingerprint:
+                await carry_forward(fingerprint, ctx)
+                ctx.journal.finish(ean, fingerprint["verdict"], fingerprint.get("deal"))
                 return
 
-            title, amazon_link, gl, image_url = product_data
+            item = {
+                "ean": ean,
+                "supplier_cost": supplier_price * VAT_RATE,
+                "supplier_link": supplier_link,
+            }
+            after = None
 
-            price_data = await sc.get_price()
-            if not price_data:
-                logger.warning(f"Failed to get price for ASIN/EAN: {asin}/{ean}.")
-                return
+        verdict = await pipeline.run(item, ctx, after=after, on_pass=ctx.checkpoint) or ACCEPTED
+        ctx.journal.finish(ean, verdict, item.get("deal"))
+        ctx.record_inputs(item, supplier_price, verdict)
 
-            price = price_data
+        if verdict == "sales" and item.get("sales") is None:
+            return
 
-            fees = await sc.get_fees(gl, price)
-            if not fees:
-                logger.warning(f"Failed to get fees for ASIN/EAN: {asin}/{ean}.")
-                return
+        if verdict in FINAL_VERDICTS:
+            ctx.fingerprints.record(ean, supplier_price, supplier_link, verdict, item.get("deal"))
 
-            profit = price - fees - supplier_cost
-            roi = (profit / supplier_cost) * 100
-            sas_link = sc.sas_link_gen()
+    except Exception as e:
+        logger.exception(
+            f"Error processing product {product.get('product_name', 'Unknown')} | {str(e)}."
+        )
 
-            if roi < 25 or profit < 1:
-                logger.info(
-                    f"ASIN {asin} skipped: [ROI {roi:.2f}%, Profit {profit:.2f}]."
-                )
-                return
 
-            sales = await sales_scraper.get_sales(asin)
-            if not sales or sales < 5:
-                logger.info(f"ASIN {asin} skipped: estimated sales = {sales}.")
+async def worker(queue: asyncio.Queue, pipeline, ctx):
+    while True:
+        product = await queue.get()
+        try:
+            if product is None:
                 return
+            await process_product(product, pipeline, ctx)
+        finally:
+            queue.task_done()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FBA deal scanner")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-evaluate every product instead of only new, changed and stale ones.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted scan from its journal instead of starting over.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="Only scan shard i of N (i/N), writing deals to a per-shard file.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Run this many shard processes locally and merge their deals.",
+    )
+    parser.add_argument(
+        "--marketplaces",
+        type=parse_marketplaces,
+        default=os.getenv("MARKETPLACES", DEFAULT_MARKETPLACE),
+        help="Comma-separated marketplaces to evaluate (e.g. FR,DE,IT,ES); the first supplies product metadata.",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Only merge existing per-shard deal files into the database.",
+    )
+    return parser.parse_args()
+
+
+async def merge(args):
+    db = Database()
+    try:
+        await merge_shards(db)
+    finally:
+        await db.close()
 
-            deal = {
-                "ean": ean,
-                "asin": asin,
-                "name": title,
-                "supplier_cost": supplier_cost,
-                "amazon_price": price,
-                "fees": fees,
-                "profit": profit,
-                "roi": roi,
-                "estimated_sales": sales,
-                "amazon_link": amazon_link,
-                "supplier_link": supplier_link,
-                "sas_link": sas_link,
-                "image_url": image_url,
-            }
 
-            saved = await db.save_deal(deal)
+async def launch(args):
+    logger.info(f"Starting {args.processes} scanner shards...")
 
-            if saved:
-                    logger.info(
-                        f"Queued ASIN {asin} [Profit: €{profit:.2f}, ROI: {roi:.2f}%]."
-                    )
+    if not args.resume:
+        for path in shard_files():
+            os.remove(path)
 
-        except Exception as e:
-            logger.exception(
-                f"Error processing product {product.get('product_name', 'Unknown')} | {str(e)}."
-            )
+    passthrough = [flag for flag, enabled in (("--full", args.full), ("--resume", args.resume)) if enabled]
+    passthrough += ["--marketplaces", ",".join(args.marketplaces)]
+    if not await run_shards(args.processes, passthrough):
+        logger.warning("Some shards failed; merging what finished.")
 
+    await merge(args)
+    logger.info("FBA Scanner finished.")
 
-async def main():
-    logger.info("Starting FBA Scanner...")
-    products = await fetch_products()
-    amazon_cookie, seller_cookie, sas_cookie = await fetch_cookies()
-    db = Database()
-    await db.reset_db()
 
-    if not products:
-        logger.error("No products fetched. Exiting.")
-        return
+async def main(args):
+    if args.merge:
+        return await merge(args)
+    if args.processes > 1 and not args.shard:
+        return await launch(args)
 
-    sales_scraper = SalesScraper(sas_cookie, headless=True)
+    logger.info(f"Starting FBA Scanner shard {args.shard[0]}/{args.shard[1]}..." if args.shard else "Starting FBA Scanner...")
+    fetch_cache = FetchCache()
+    queue = asyncio.Queue(maxsize=WORKERS * 2)
 
-    await sales_scraper.start()
+    async with aiohttp.ClientSession(timeout=FEED_TIMEOUT) as session:
+        # The feed starts downloading alongside the cookies and setup; the
+        # bounded queue holds it back until the workers drain it.
+        feed = asyncio.create_task(stream_products(queue, fetch_cache, session, args.shard))
+        try:
+            cookies = await fetch_cookies(fetch_cache, session)
+            await scan(args, cookies, queue, feed)
+        finally:
+            feed.cancel()
 
-    semaphore = asyncio.Semaphore(100)
-    tasks = [process_product(p, semaphore, amazon_cookie, seller_cookie, db, sales_scraper) for p in products]
-    await asyncio.gather(*tasks)
+    logger.info("FBA Scanner finished.")
 
-    await sales_scraper.close()
 
-    logger.info("FBA Scanner finished.")
+async def scan(args, cookies: tuple, queue: asyncio.Queue, feed: asyncio.Task):
+    amazon_cookie, seller_cookie, sas_cookie = cookies
+    db = Database("json", shard_path(args.shard)) if args.shard else Database()
+    await db.reset_db()
+
+    journal = ScanJournal(journal_path(args.shard, JOURNAL_PATH)) if args.shard else ScanJournal()
+    resumed = journal.load() if args.resume else {}
+    if resumed:
+        await replay_journal(resumed, db)
+    journal.open(resume=args.resume)
+
+    sales_cache = DiskCache("sas_sales", max_entries=200_000)
+    sales_scraper = SalesScraper(
+        sas_cookie,
+        headless=True,
+        cache=sales_cache,
+        max_age=float(os.getenv("SALES_MAX_AGE_DAYS", "7")) * 24 * 3600,
+    )
+
+    asin_cache = DiskCache("ean2asin", max_entries=200_000)
+    product_cache = DiskCache("seller_products", max_entries=200_000)
+    fee_cache = DiskCache("fba_fees", max_entries=200_000)
+    seller_centrals = {
+        marketplace: SellerCentral(seller_cookie, product_cache, marketplace)
+        for marketplace in args.marketplaces
+    }
+    fee_models = {
+        marketplace: FeeModel(seller_central, fee_cache)
+        for marketplace, seller_central in seller_centrals.items()
+    }
+    fingerprint_cache = DiskCache("fingerprints", max_entries=500_000)
+    fingerprints = FingerprintStore(fingerprint_cache, full=args.full, scope=",".join(args.marketplaces))
+    inputs = InputStore()
+
+    ctx = ScanContext(
+        amazon_cookie, asin_cache, args.marketplaces, seller_centrals, fee_models,
+        sales_scraper, db, fingerprints, journal, resumed, inputs,
+    )
+    pipeline = build_pipeline()
+
+    await sales_scraper.start()
+
+    started = time.time()
+    workers = [asyncio.create_task(worker(queue, pipeline, ctx)) for _ in range(WORKERS)]
+
+    try:
+        count, complete = await feed
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+        if not count:
+            logger.error("No products fetched.")
+        elif complete:
+            # Every product still in the feed was touched since `started`.
+            inputs.prune(started, owns=(lambda ean: in_shard(ean, args.shard)) if args.shard else None)
+    finally:
+        for task in workers:
+            task.cancel()
+        logger.info(f"Feed diff: {fingerprints.stats()}")
+        pipeline.log_summary()
+        limiter.log_summary()
+        await sales_scraper.close()
+        sales_cache.close()
+        asin_cache.close()
+        product_cache.close()
+        fee_cache.close()
+        fingerprint_cache.close()
+        journal.close()
+        inputs.close()
+        for marketplace, fee_model in fee_models.items():
+            logger.info(f"Fee model {marketplace}: {fee_model.stats()}")
+        await close_sessions()
+        close_parsers()
+        await db.close()
+
+        metrics.write_report(
+            f"scanner.{args.shard[0]}-of-{args.shard[1]}" if args.shard else "scanner",
+            pipeline=pipeline.stats(),
+            hosts=limiter.metrics(),
+            caches={cache.name: cache.stats() for cache in (sales_cache, asin_cache, product_cache, fee_cache, fingerprint_cache)},
+            fee_models={marketplace: fee_model.stats() for marketplace, fee_model in fee_models.items()},
+            feed=fingerprints.stats(),
+        )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,58 @@
+import random
+import asyncio
+from types import SimpleNamespace
+from core.fees import CLOSING_FEES, DIGITAL_SERVICES_RATES, MIN_REFERRAL_FEE, REFERRAL_RATES, FeeModel
+from core.marketplaces import MARKETPLACES
+from core.seller_central import SellerCentral
+from scanner import bound_roi, check_roi
+
+GLS = list(REFERRAL_RATES) + ["gl_unknown", None]
+RATES = sorted({rate for rates in REFERRAL_RATES.values() for rate in rates[:2]})
+
+
+def real_fees(rng: random.Random, marketplace: str, gl, price: float) -> float:
+    """
+    A plausible real fee total: table referral/closing fees (any category's
+    rate when the gl is unknown) plus arbitrary non-negative learned parts.
+    """
+    if gl in REFERRAL_RATES:
+        rate, high_rate, threshold = REFERRAL_RATES[gl]
+        rate = high_rate if price > threshold else rate
+    else:
+        rate = rng.choice(RATES)
+    referral = max(price * rate, MIN_REFERRAL_FEE)
+    closing = CLOSING_FEES.get(gl, 0.0) + rng.choice([0.0, rng.uniform(0, 1)])
+    fulfillment = rng.choice([0.0, rng.uniform(0, 8)])
+    storage = rng.choice([0.0, rng.uniform(0, 1)])
+    digital_services = (referral + closing + fulfillment) * DIGITAL_SERVICES_RATES.get(marketplace, 0.0)
+    return round(referral + closing + fulfillment + storage + digital_services, 2)
+
+
+async def check_bounds(cases: int):
+    rng = random.Random(0)
+    fee_models = {
+        marketplace: FeeModel(SellerCentral("cookie", None, marketplace), None)
+        for marketplace in MARKETPLACES
+    }
+    ctx = SimpleNamespace(fee_models=fee_models)
+
+    for _ in range(cases):
+        marketplace = rng.choice(list(MARKETPLACES))
+        gl = rng.choice(GLS)
+        price = round(rng.uniform(1, 120), 2)
+        item = {
+            "asin": "B000000000",
+            "gl": gl,
+            "supplier_cost": round(rng.uniform(0.5, 100), 2),
+            "offers": {marketplace: {"price": price}},
+        }
+
+        kept = await bound_roi(item, ctx)
+        item["offers"] = {marketplace: {"price": price, "fees": real_fees(rng, marketplace, gl, price)}}
+        accepted = await check_roi(item, ctx)
+
+        assert kept or not accepted, (marketplace, gl, price, item)
+
+
+def test_bound_roi_never_rejects_what_check_roi_accepts():
+    asyncio.run(check_bounds(5_000))
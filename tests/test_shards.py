@@ -0,0 +1,70 @@
+import os
+import asyncio
+import pytest
+from core.database import Database
+from core.deal import Deal
+from core.shards import merge_shards, shard_files
+from core.storage import write_deals
+
+
+def make_deal(asin: str) -> Deal:
+    return Deal(
+        ean=f"ean-{asin}",
+        asin=asin,
+        name=f"Product {asin}",
+        supplier_cost=10.0,
+        amazon_price=25.0,
+        fees=5.0,
+        profit=10.0,
+        roi=100.0,
+        estimated_sales=12,
+        supplier_link="https://example.com",
+        image_url="https://example.com/image.jpg",
+        created_at="2026-01-01T00:00:00+00:00",
+    )
+
+
+def write_shards(directory: str):
+    write_deals(os.path.join(directory, "deals.0-of-2.json"), [make_deal("B000000001"), make_deal("B000000002")])
+    write_deals(os.path.join(directory, "deals.1-of-2.json"), [make_deal("B000000003")])
+
+
+async def merge_into(path: str, directory: str) -> tuple:
+    db = Database("json", path)
+    try:
+        merged = await merge_shards(db, directory)
+        return merged, await db.count()
+    finally:
+        await db.close()
+
+
+def test_shard_files_skip_sidecars(tmp_path):
+    write_shards(str(tmp_path))
+
+    assert [os.path.basename(path) for path in shard_files(str(tmp_path))] == ["deals.0-of-2.json", "deals.1-of-2.json"]
+
+
+def test_merge_shards(tmp_path):
+    shards = tmp_path / "shards"
+    shards.mkdir()
+    write_shards(str(shards))
+
+    assert asyncio.run(merge_into(str(tmp_path / "deals.json"), str(shards))) == (3, 3)
+
+
+def test_bad_shard_leaves_database_untouched(tmp_path):
+    shards = tmp_path / "shards"
+    shards.mkdir()
+    path = str(tmp_path / "deals.json")
+    write_shards(str(shards))
+    assert asyncio.run(merge_into(path, str(shards))) == (3, 3)
+
+    (shards / "deals.1-of-2.json").write_text('[{"asin": "B000000009"}]', encoding="utf-8")
+    with pytest.raises(ValueError, match="deals.1-of-2.json"):
+        asyncio.run(merge_into(path, str(shards)))
+
+    db = Database("json", path)
+    try:
+        assert asyncio.run(db.count()) == 3
+    finally:
+        asyncio.run(db.close())